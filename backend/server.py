@@ -1,15 +1,29 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Depends, Header, Response
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from contextlib import asynccontextmanager
 import os
 import logging
 import csv
+import json
 import io
 import random
+import asyncio
+import uuid
+import bisect
+import heapq
+import warnings
+import time
+import hashlib
+import fcntl
+import math
 import jwt
 from pathlib import Path
+from functools import lru_cache
+from itertools import product
+from collections import Counter, defaultdict
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime, timezone
@@ -17,11 +31,114 @@ from datetime import datetime, timezone
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Connection pools. Public (spectator) reads get their own client so a burst of
+# leaderboard polling can't starve judges' writes of connections, and can be
+# routed to secondaries with bounded staleness.
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '50'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '5'))
+MONGO_PUBLIC_MAX_POOL_SIZE = int(os.environ.get('MONGO_PUBLIC_MAX_POOL_SIZE', '100'))
+MONGO_PUBLIC_MIN_POOL_SIZE = int(os.environ.get('MONGO_PUBLIC_MIN_POOL_SIZE', '10'))
+MONGO_PUBLIC_READ_PREFERENCE = os.environ.get('MONGO_PUBLIC_READ_PREFERENCE', 'primary')
+MONGO_PUBLIC_MAX_STALENESS_SECONDS = int(os.environ.get('MONGO_PUBLIC_MAX_STALENESS_SECONDS', '90'))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000'))
+
+READ_PREFERENCES = {
+    "primary": "Primary",
+    "primaryPreferred": "PrimaryPreferred",
+    "secondary": "Secondary",
+    "secondaryPreferred": "SecondaryPreferred",
+    "nearest": "Nearest",
+}
+
+def public_read_preference():
+    from pymongo import read_preferences
+    
+    mode = READ_PREFERENCES.get(MONGO_PUBLIC_READ_PREFERENCE)
+    if mode is None:
+        raise ValueError(f"Unknown MONGO_PUBLIC_READ_PREFERENCE: {MONGO_PUBLIC_READ_PREFERENCE}")
+    if mode == "Primary":
+        return read_preferences.Primary()
+    # MongoDB requires maxStalenessSeconds >= 90; -1 disables the bound
+    return getattr(read_preferences, mode)(max_staleness=MONGO_PUBLIC_MAX_STALENESS_SECONDS)
+
+mongo_clients = []
+
+def _mongo_client(max_pool_size: int, min_pool_size: int):
+    # The driver is imported here rather than at module level: it is one of
+    # the slowest imports and a worker should be able to answer health checks
+    # before it has touched Mongo at all
+    from motor.motor_asyncio import AsyncIOMotorClient
+    
+    client = AsyncIOMotorClient(
+        os.environ['MONGO_URL'],
+        maxPoolSize=max_pool_size,
+        minPoolSize=min_pool_size,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    )
+    mongo_clients.append(client)
+    return client
+
+class LazyDatabase:
+    """Stands in for a Motor database, creating the client on first use."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._db = None
+
+    def _get(self):
+        if self._db is None:
+            self._db = self._factory()
+        return self._db
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __getitem__(self, name):
+        return self._get()[name]
+
+# `db` is for writes and anything that must read its own writes (admin flows,
+# cache loads); `public_db` serves the unauthenticated read endpoints.
+db = LazyDatabase(lambda: _mongo_client(MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE)[os.environ['DB_NAME']])
+public_db = LazyDatabase(lambda: _mongo_client(MONGO_PUBLIC_MAX_POOL_SIZE, MONGO_PUBLIC_MIN_POOL_SIZE).get_database(
+    os.environ['DB_NAME'], read_preference=public_read_preference()
+))
+
+async def next_sequence(name: str) -> int:
+    """Allocate the next value of a counter shared by every worker."""
+    from pymongo import ReturnDocument
+    
+    doc = await db.counters.find_one_and_update(
+        {"_id": name}, {"$inc": {"value": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    return doc["value"]
+
+# Workers share a version per kind of data in `counters`; in-process caches
+# remember the version they were built at and compare it against the latest
+# one this worker has seen, either from its own bump or from the poll.
+DATA_VERSION_POLL_SECONDS = float(os.environ.get('DATA_VERSION_POLL_SECONDS', '1'))
+data_versions = {"public": 0, "members": 0}
+
+async def bump_data_version(kind: str) -> int:
+    version = await next_sequence(f"data:{kind}")
+    data_versions[kind] = max(data_versions[kind], version)
+    return version
+
+async def poll_data_versions():
+    ids = [f"data:{kind}" for kind in data_versions]
+    async for doc in db.counters.find({"_id": {"$in": ids}}):
+        kind = doc["_id"].split(":", 1)[1]
+        data_versions[kind] = max(data_versions[kind], doc["value"])
+
+async def watch_data_versions():
+    while True:
+        await asyncio.sleep(DATA_VERSION_POLL_SECONDS)
+        try:
+            await poll_data_versions()
+            if member_index.version != data_versions["members"]:
+                await rebuild_member_index()
+        except Exception as e:
+            logger.warning(f"Data version poll failed: {e}")
 
-app = FastAPI()
 api_router = APIRouter(prefix="/api")
 security = HTTPBearer(auto_error=False)
 
@@ -29,14 +146,17 @@ JWT_SECRET = "trio-tag-365-secret-key"
 ADMIN_USERNAME = "365run"
 ADMIN_PASSWORD = "GANG365"
 
-STATIONS = [
-    "Row 750m",
-    "Farmers carry 24kg/16kg - 60m",
-    "Ski 750m",
-    "Broad burpee jumps 40m",
-    "Assault bike - 90cal",
-    "Body weight lunges 40m"
+# Used until an event stores its own station list (see PUT /api/stations)
+DEFAULT_STATIONS = [
+    {"name": "Row 750m", "unit": "time"},
+    {"name": "Farmers carry 24kg/16kg - 60m", "unit": "time"},
+    {"name": "Ski 750m", "unit": "time"},
+    {"name": "Broad burpee jumps 40m", "unit": "time"},
+    {"name": "Assault bike - 90cal", "unit": "time"},
+    {"name": "Body weight lunges 40m", "unit": "time"}
 ]
+STATION_CONFIG_POLL_SECONDS = float(os.environ.get('STATION_CONFIG_POLL_SECONDS', '5'))
+MAX_STATIONS = 12
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -65,6 +185,19 @@ class MemberModel(BaseModel):
 class EditTeamRequest(BaseModel):
     members: List[MemberModel]
 
+class CheckInRequest(BaseModel):
+    present: List[str] = []
+    absent: List[str] = []
+    absent_unchecked: bool = False  # mark everyone not checked in yet as absent
+    repair: bool = True
+
+class StationDefinition(BaseModel):
+    name: str
+    unit: str = "time"  # "time", "reps" or "distance"
+
+class StationConfigRequest(BaseModel):
+    stations: List[StationDefinition]
+
 # --- Auth ---
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     if not credentials:
@@ -77,6 +210,20 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+def read_db(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Database for a read endpoint shared by spectators and the admin panel.
+
+    Admins re-read right after their own writes, so a valid token gets the
+    primary; everyone else gets public_db and its read preference.
+    """
+    if credentials:
+        try:
+            jwt.decode(credentials.credentials, JWT_SECRET, algorithms=["HS256"])
+            return db
+        except jwt.InvalidTokenError:
+            pass
+    return public_db
+
 @api_router.post("/auth/login")
 async def login(req: LoginRequest):
     if req.username == ADMIN_USERNAME and req.password == ADMIN_PASSWORD:
@@ -87,8 +234,770 @@ async def login(req: LoginRequest):
         return {"token": token, "username": req.username}
     raise HTTPException(status_code=401, detail="Invalid credentials")
 
+# --- Station Configuration ---
+# Stations are stored per event in `event_config` and compiled once into a
+# StationConfig (name -> index, one parser per station). Requests only touch
+# the compiled object; a background poll of the stored version swaps in a new
+# one when another worker changes the configuration.
+def _parse_time(raw: str) -> int:
+    parts = raw.split(":")
+    if len(parts) != 2:
+        raise ValueError("Time must be in MM:SS format")
+    try:
+        minutes = int(parts[0])
+        seconds = int(parts[1])
+    except ValueError:
+        raise ValueError("Invalid time format. Use MM:SS")
+    if minutes < 0 or seconds < 0 or seconds > 59:
+        raise ValueError("Invalid time format. Use MM:SS")
+    return minutes * 60 + seconds
+
+def _parse_reps(raw: str) -> int:
+    raw = raw.strip().lower().removesuffix("reps").strip()
+    if not raw.isdigit():
+        raise ValueError("Reps must be a whole number")
+    return int(raw)
+
+def _parse_distance(raw: str) -> int:
+    """Parse a distance in metres ("120", "120m" or "1.2km")."""
+    raw = raw.strip().lower().replace(" ", "")
+    scale = 1
+    if raw.endswith("km"):
+        raw, scale = raw[:-2], 1000
+    elif raw.endswith("m"):
+        raw = raw[:-1]
+    try:
+        metres = float(raw) * scale
+    except ValueError:
+        metres = math.nan
+    # float() also accepts "inf", "nan" and overflowing exponents
+    if not math.isfinite(metres):
+        raise ValueError("Distance must be in metres, e.g. 120m or 1.2km")
+    if metres < 0:
+        raise ValueError("Distance cannot be negative")
+    return int(round(metres))
+
+STATION_UNITS = {
+    "time": {"parse": _parse_time, "format": lambda v: format_seconds(v), "lower_is_better": True, "hint": "MM:SS"},
+    "reps": {"parse": _parse_reps, "format": lambda v: f"{v} reps", "lower_is_better": False, "hint": "Reps"},
+    "distance": {"parse": _parse_distance, "format": lambda v: f"{v}m", "lower_is_better": False, "hint": "Metres"},
+}
+
+class StationConfig:
+    """Compiled, read-only view of one event's stations."""
+
+    def __init__(self, definitions: List[dict], version: int = 0):
+        self.version = version
+        self.definitions = [{"name": d["name"], "unit": d["unit"]} for d in definitions]
+        self.names = [d["name"] for d in self.definitions]
+        self.units = [d["unit"] for d in self.definitions]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self._parsers = [STATION_UNITS[u]["parse"] for u in self.units]
+        self._formatters = [STATION_UNITS[u]["format"] for u in self.units]
+        self.lower_is_better = [STATION_UNITS[u]["lower_is_better"] for u in self.units]
+        # Only timed stations add up to a team's total time
+        self.time_indices = [i for i, u in enumerate(self.units) if u == "time"]
+
+    def parse(self, station: str, raw: str):
+        """Return (station index, numeric value) or raise a 400."""
+        idx = self.index.get(station)
+        if idx is None:
+            raise HTTPException(status_code=400, detail=f"Invalid station: {station}")
+        try:
+            return idx, self._parsers[idx](raw)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def format(self, idx: int, value: int) -> str:
+        return self._formatters[idx](value)
+
+    def total_seconds(self, times: List[Optional[int]]) -> int:
+        return sum(times[i] for i in self.time_indices if times[i] is not None)
+
+    def describe(self) -> List[dict]:
+        return [{**d, "hint": STATION_UNITS[d["unit"]]["hint"]} for d in self.definitions]
+
+def validate_station_definitions(definitions: List[StationDefinition]) -> List[dict]:
+    if not 1 <= len(definitions) <= MAX_STATIONS:
+        raise HTTPException(status_code=400, detail=f"An event needs between 1 and {MAX_STATIONS} stations")
+    result = []
+    seen = set()
+    for d in definitions:
+        name = d.name.strip()
+        unit = d.unit.strip().lower()
+        if not name:
+            raise HTTPException(status_code=400, detail="Station name cannot be empty")
+        if name in seen:
+            raise HTTPException(status_code=400, detail=f"Duplicate station: {name}")
+        if "." in name or name.startswith("$"):
+            # Station names are used as keys in station_times
+            raise HTTPException(status_code=400, detail=f"Station name cannot contain '.' or start with '$': {name}")
+        if unit not in STATION_UNITS:
+            raise HTTPException(status_code=400, detail=f"Invalid unit for {name}: must be one of {', '.join(STATION_UNITS)}")
+        seen.add(name)
+        result.append({"name": name, "unit": unit})
+    return result
+
+station_config = StationConfig(DEFAULT_STATIONS)
+
+def apply_station_config(definitions: List[dict], version: int):
+    global station_config
+    station_config = StationConfig(definitions, version)
+    projection_cache.invalidate()
+    rank_history.reset()
+    # Every worker applies the config itself, so a local refresh is enough
+    display_feed.invalidate()
+    snapshot_publisher.schedule()
+    logger.info(f"Loaded station config v{version}: {', '.join(station_config.names)}")
+
+async def load_station_config():
+    doc = await db.event_config.find_one({"key": "stations"}, {"_id": 0})
+    if doc and doc["version"] != station_config.version:
+        apply_station_config(doc["stations"], doc["version"])
+
+async def watch_station_config():
+    while True:
+        await asyncio.sleep(STATION_CONFIG_POLL_SECONDS)
+        try:
+            # Version-only probe; the full document is read only on change
+            doc = await db.event_config.find_one({"key": "stations"}, {"_id": 0, "version": 1})
+            if doc and doc["version"] != station_config.version:
+                await load_station_config()
+        except Exception as e:
+            logger.warning(f"Station config poll failed: {e}")
+
+# --- Station Time Storage ---
+# "map" keeps station_times keyed by station name with time_str/total_seconds;
+# "array" stores a fixed-length `times` list of seconds indexed by station
+# position (None = not run yet). Readers accept both so the migration can run
+# while the event is live.
+COMPACT_STATION_TIMES = os.environ.get('STATION_TIMES_SCHEMA', 'map').lower() == 'array'
+MIGRATION_BATCH_SIZE = 500
+
+@lru_cache(maxsize=4096)
+def format_seconds(total_seconds: int) -> str:
+    return f"{total_seconds // 60:02d}:{total_seconds % 60:02d}"
+
+def team_times(team: dict) -> List[Optional[int]]:
+    times = team.get("times")
+    n = len(station_config.names)
+    if isinstance(times, list):
+        if len(times) == n:
+            return times
+        return (times + [None] * n)[:n]
+    station_times = team.get("station_times", {})
+    return [station_value(station_times[s]) if s in station_times else None for s in station_config.names]
+
+def station_value(entry: dict) -> int:
+    # Timed stations keep the original total_seconds key; reps/distance use value
+    return entry["total_seconds"] if "total_seconds" in entry else entry["value"]
+
+def station_entry(idx: int, value: int, display: Optional[str] = None) -> dict:
+    display = display or station_config.format(idx, value)
+    if station_config.units[idx] == "time":
+        return {"time_str": display, "total_seconds": value}
+    return {"time_str": display, "value": value}
+
+def station_times_map(times: List[Optional[int]]) -> dict:
+    return {
+        station: station_entry(i, t)
+        for i, (station, t) in enumerate(zip(station_config.names, times)) if t is not None
+    }
+
+def present_team(team: dict) -> dict:
+    """Return the team in the API shape, expanding compact times if needed."""
+    if "times" not in team:
+        return team
+    team = dict(team)
+    team["station_times"] = station_times_map(team_times(team))
+    del team["times"]
+    return team
+
+def new_team_doc(team_id: int, members: List[dict]) -> dict:
+    doc = {
+        "team_id": team_id,
+        "members": [{"name": m["name"], "gender": m["gender"]} for m in members],
+    }
+    if COMPACT_STATION_TIMES:
+        doc["times"] = [None] * len(station_config.names)
+    else:
+        doc["station_times"] = {}
+    return doc
+
+def compact_migration_op(team: dict):
+    from pymongo import UpdateOne
+    
+    # Match on the exact station_times we read so a concurrent map-format
+    # write makes this update a no-op instead of being overwritten.
+    query = {"team_id": team["team_id"], "times": {"$exists": False}}
+    if "station_times" in team:
+        query["station_times"] = team["station_times"]
+    else:
+        query["station_times"] = {"$exists": False}
+    return UpdateOne(query, {"$set": {"times": team_times(team)}, "$unset": {"station_times": ""}})
+
+async def save_compact_time(team_id: int, station_idx: int, total_seconds: int):
+    query = {"team_id": team_id, "times": {"$type": "array"}}
+    update = {"$set": {f"times.{station_idx}": total_seconds}}
+    result = await db.teams.update_one(query, update)
+    if result.matched_count:
+        return
+    # Team still in map format: migrate it first, then write
+    team = await db.teams.find_one({"team_id": team_id}, {"_id": 0})
+    if not team:
+        return
+    if "times" not in team:
+        await db.teams.bulk_write([compact_migration_op(team)])
+    await db.teams.update_one(query, update)
+
+@api_router.post("/admin/migrate-station-times", status_code=202)
+async def migrate_station_times(_=Depends(verify_token)):
+    """Convert map-format station_times to the compact array schema in batches."""
+    async def work(progress: JobProgress):
+        total = await db.teams.count_documents({"times": {"$exists": False}})
+        migrated = 0
+        for _pass in range(3):
+            cursor = db.teams.find({"times": {"$exists": False}}, {"_id": 0})
+            pending = 0
+            batch = []
+            async for team in cursor:
+                pending += 1
+                batch.append(compact_migration_op(team))
+                if len(batch) >= MIGRATION_BATCH_SIZE:
+                    result = await db.teams.bulk_write(batch, ordered=False)
+                    migrated += result.modified_count
+                    batch = []
+                    await progress.report("migrating teams", migrated, total)
+            if batch:
+                result = await db.teams.bulk_write(batch, ordered=False)
+                migrated += result.modified_count
+                await progress.report("migrating teams", migrated, total)
+            if not pending:
+                break
+        remaining = await db.teams.count_documents({"times": {"$exists": False}})
+        return {"migrated": migrated, "remaining": remaining, "message": f"Migrated {migrated} teams"}
+    
+    job = await job_runner.submit("migrate_station_times", work)
+    return job_response(job, "Migrating station times")
+
+# --- Member Search ---
+# Typo candidates checked per query token, those sharing the most bigrams first
+FUZZY_CANDIDATE_LIMIT = 24
+
+def _name_tokens(name: str) -> List[str]:
+    return [t for t in name.lower().split() if t]
+
+def _name_grams(token: str) -> set:
+    padded = f"^{token}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+def _typo_distances(q: str, tokens: List[str], max_dist: int) -> dict:
+    """Map each token to its edit distance from q, or from its prefix of the
+    same length if that is smaller, counting adjacent transpositions as one
+    edit; anything over max_dist comes back as max_dist + 1.
+
+    Rows of the DP table follow the token's characters, so with tokens in
+    sorted order each one reuses the rows of the prefix it shares with the
+    previous one. Only the diagonal band within max_dist is computed.
+    """
+    over = max_dist + 1
+    m = len(q)
+    rows = [[i if i <= max_dist else over for i in range(m + 1)]]
+    prev_t = ""
+    distances = {}
+    for token in tokens:
+        t = token[:m + max_dist]
+        shared = 0
+        while shared < min(len(t), len(prev_t), len(rows) - 1) and t[shared] == prev_t[shared]:
+            shared += 1
+        del rows[shared + 1:]
+        for j in range(shared + 1, len(t) + 1):
+            prev, cb = rows[j - 1], t[j - 1]
+            prev2 = rows[j - 2] if j > 1 else None
+            cur = [over] * (m + 1)
+            if j <= max_dist:
+                cur[0] = j
+            for i in range(max(1, j - max_dist), min(m, j + max_dist) + 1):
+                # Plain comparisons instead of min(): this is the hot loop of
+                # every fuzzy search
+                ca = q[i - 1]
+                d = prev[i - 1] if ca == cb else prev[i - 1] + 1
+                if prev[i] < d:
+                    d = prev[i] + 1
+                if cur[i - 1] < d:
+                    d = cur[i - 1] + 1
+                if prev2 is not None and i > 1 and ca == t[j - 2] and q[i - 2] == cb and prev2[i - 2] < d:
+                    d = prev2[i - 2] + 1
+                cur[i] = d if d < over else over
+            rows.append(cur)
+            if min(cur) == over:
+                # Every longer prefix is over budget too
+                break
+        prev_t = t
+        
+        dist = over
+        if len(token) >= m and len(rows) > m:
+            dist = rows[m][m]
+        if len(token) <= m + max_dist and len(rows) > len(token):
+            dist = min(dist, rows[len(token)][m])
+        distances[token] = dist
+    return distances
+
+_NO_MATCH = float("inf")
+
+class MemberSearchIndex:
+    """In-memory index over participant and team member names.
+
+    Names are split into lowercase tokens. A sorted token list serves prefix
+    lookups via bisect, and a bigram index over distinct tokens narrows the
+    candidates for typo-tolerant matching. Entries are added and removed per
+    team so edits never require a full rebuild.
+
+    `version` is the "members" data version the index reflects; workers
+    rebuild from Mongo when the shared version moves past it.
+    """
+
+    def __init__(self):
+        self._entries = {}                    # entry_id -> entry dict
+        self._team_entries = defaultdict(list)  # team_id -> [entry_id]
+        self._participant_entries = []
+        self._team_waves = {}                 # team_id -> wave_id
+        self._token_entries = defaultdict(set)  # token -> {entry_id}
+        self._by_name = {}                    # token -> [entry_id] sorted by name, built on demand
+        self._sorted_tokens = []
+        self._grams = defaultdict(set)        # bigram -> {token}
+        self._member_names = defaultdict(int)   # lowercase name -> team entries
+        self._next_id = 0
+        self.version = 0
+        self.changes = 0                      # local edits, so a rebuild can tell it raced one
+
+    def _add(self, name: str, gender: str, team_id: Optional[int]) -> int:
+        entry_id = self._next_id
+        self._next_id += 1
+        self.changes += 1
+        key = name.lower()
+        tokens = _name_tokens(name)
+        self._entries[entry_id] = {"name": name, "key": key, "tokens": tokens, "gender": gender, "team_id": team_id}
+        if team_id is not None:
+            self._member_names[key] += 1
+        for token in tokens:
+            if not self._token_entries[token]:
+                bisect.insort(self._sorted_tokens, token)
+                for gram in _name_grams(token):
+                    self._grams[gram].add(token)
+            self._token_entries[token].add(entry_id)
+            self._by_name.pop(token, None)
+        return entry_id
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        self.changes += 1
+        if entry["team_id"] is not None:
+            self._member_names[entry["key"]] -= 1
+            if not self._member_names[entry["key"]]:
+                del self._member_names[entry["key"]]
+        for token in entry["tokens"]:
+            ids = self._token_entries.get(token)
+            if ids is None:
+                continue
+            ids.discard(entry_id)
+            self._by_name.pop(token, None)
+            if not ids:
+                del self._token_entries[token]
+                pos = bisect.bisect_left(self._sorted_tokens, token)
+                if pos < len(self._sorted_tokens) and self._sorted_tokens[pos] == token:
+                    del self._sorted_tokens[pos]
+                for gram in _name_grams(token):
+                    self._grams[gram].discard(token)
+                    if not self._grams[gram]:
+                        del self._grams[gram]
+
+    def clear(self):
+        version, changes = self.version, self.changes
+        self.__init__()
+        self.version, self.changes = version, changes + 1
+
+    def replace_participants(self, participants: List[dict]):
+        for entry_id in self._participant_entries:
+            self._remove(entry_id)
+        self._participant_entries = [self._add(p["name"], p["gender"], None) for p in participants]
+
+    def replace_teams(self, teams: List[dict], waves: List[dict]):
+        for team_id in list(self._team_entries):
+            self.remove_team(team_id)
+        self._team_waves = {tid: w["wave_id"] for w in waves for tid in w["team_ids"]}
+        for team in teams:
+            self.set_team_members(team["team_id"], team["members"])
+
+    def set_team_members(self, team_id: int, members: List[dict]):
+        self.remove_team(team_id)
+        self._team_entries[team_id] = [self._add(m["name"], m["gender"], team_id) for m in members]
+
+    def remove_team(self, team_id: int):
+        for entry_id in self._team_entries.pop(team_id, []):
+            self._remove(entry_id)
+
+    def set_wave(self, wave: dict):
+        self.changes += 1
+        for tid in wave["team_ids"]:
+            self._team_waves[tid] = wave["wave_id"]
+
+    def _fuzzy_tokens(self, q: str) -> dict:
+        """Return {token: edit distance} for index tokens that don't start
+        with query token q but are within a small typo budget of it (or of
+        their prefix of the same length)."""
+        max_typos = 0 if len(q) < 4 else (1 if len(q) <= 6 else 2)
+        if not max_typos:
+            return {}
+        # Like most fuzzy matchers, trust the first letter: typos there are
+        # rare and it keeps the candidate set small.
+        same_initial = self._grams.get("^" + q[0])
+        if not same_initial:
+            return {}
+        q_grams = _name_grams(q)
+        # Bigrams every candidate has (q's first one, at least) add the same
+        # to every count, so only the others are counted
+        shared_by_all = 0
+        overlap = Counter()
+        for gram in q_grams:
+            tokens = self._grams.get(gram)
+            if not tokens:
+                continue
+            if len(tokens) >= len(same_initial) and same_initial <= tokens:
+                shared_by_all += 1
+            else:
+                overlap.update(tokens & same_initial)
+        # A single edit touches at most two bigrams; the query's end marker
+        # is never shared with a longer token's prefix.
+        needed = len(q_grams) - 2 * max_typos - 1 - shared_by_all
+        # Only the FUZZY_CANDIDATE_LIMIT sharing the most bigrams get the edit
+        # distance check; ties go by name so every worker keeps the same ones
+        cut, above = needed, 0
+        for shared, count in sorted(Counter(overlap.values()).items(), reverse=True):
+            if shared < needed or above + count >= FUZZY_CANDIDATE_LIMIT:
+                cut = max(shared, needed)
+                break
+            above += count
+        candidates = [t for t, shared in overlap.items() if shared > cut and not t.startswith(q)]
+        tied = sorted(t for t, shared in overlap.items() if shared == cut and not t.startswith(q))
+        candidates += tied[:FUZZY_CANDIDATE_LIMIT - len(candidates)]
+        if needed <= 0:
+            # Then tokens sharing only the common bigrams, already in name order
+            sorted_tokens = self._sorted_tokens
+            i = bisect.bisect_left(sorted_tokens, q[0])
+            while len(candidates) < FUZZY_CANDIDATE_LIMIT and i < len(sorted_tokens) and sorted_tokens[i][0] == q[0]:
+                token = sorted_tokens[i]
+                if token not in overlap and not token.startswith(q):
+                    candidates.append(token)
+                i += 1
+        candidates.sort()
+        distances = _typo_distances(q, candidates, max_typos)
+        return {token: dist for token, dist in distances.items() if dist <= max_typos}
+
+    def _tiers(self, q: str):
+        """Yield (score, tokens) for index tokens matching query token q, best
+        score first: prefix matches score 0, typo matches their edit distance.
+
+        Fuzzy matching only runs if the caller gets past the prefix tier.
+        """
+        lo = bisect.bisect_left(self._sorted_tokens, q)
+        hi = bisect.bisect_left(self._sorted_tokens, q[:-1] + chr(ord(q[-1]) + 1), lo)
+        yield 0, self._sorted_tokens[lo:hi]
+        fuzzy = self._fuzzy_tokens(q)
+        for dist in sorted(set(fuzzy.values())):
+            yield dist, sorted(token for token, d in fuzzy.items() if d == dist)
+
+    def _entries_by_name(self, token: str) -> List[int]:
+        ordered = self._by_name.get(token)
+        if ordered is None:
+            entries = self._entries
+            ordered = sorted(self._token_entries[token], key=lambda eid: (entries[eid]["key"], eid))
+            self._by_name[token] = ordered
+        return ordered
+
+    def _rank_token(self, q: str):
+        """Yield (entry_id, score) for a one-token query, ordered by score,
+        then matched token, then name; broad prefixes stop after a page."""
+        seen = set()
+        for score, tokens in self._tiers(q):
+            for token in tokens:
+                for entry_id in self._entries_by_name(token):
+                    if entry_id not in seen:
+                        seen.add(entry_id)
+                        yield entry_id, score
+
+    def _rank_tokens(self, q_tokens: List[str]):
+        """Yield (entry_id, score) for a multi-token query, ordered by the
+        summed score, then name.
+
+        Candidates are intersected smallest match set first; a query token
+        matching far more entries than are left is only checked against the
+        survivors' own tokens.
+        """
+        matches = []
+        for q in q_tokens:
+            tiers = list(self._tiers(q))
+            tokens = [t for _, ts in tiers for t in ts]
+            size = sum(len(self._token_entries[t]) for t in tokens)
+            fuzzy = {t: score for score, ts in tiers if score for t in ts}
+            matches.append((size, q, tokens, fuzzy))
+        matches.sort(key=lambda m: m[0])
+        
+        candidates = set().union(*(self._token_entries[t] for t in matches[0][2]))
+        for size, _, tokens, _ in matches[1:]:
+            if candidates and size < 8 * len(candidates):
+                candidates.intersection_update(set().union(*(self._token_entries[t] for t in tokens)))
+        
+        scored = []
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            total = 0
+            for _, q, _, fuzzy in matches:
+                best = _NO_MATCH
+                for t in entry["tokens"]:
+                    if t.startswith(q):
+                        best = 0
+                        break
+                    best = min(best, fuzzy.get(t, _NO_MATCH))
+                if best == _NO_MATCH:
+                    break
+                total += best
+            else:
+                scored.append((total, entry["key"], entry_id))
+        heapq.heapify(scored)
+        while scored:
+            total, _, entry_id = heapq.heappop(scored)
+            yield entry_id, total
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        q_tokens = _name_tokens(query)
+        if not q_tokens:
+            return []
+        
+        ranked = self._rank_token(q_tokens[0]) if len(q_tokens) == 1 else self._rank_tokens(q_tokens)
+        results = []
+        for entry_id, score in ranked:
+            entry = self._entries[entry_id]
+            # Each participant on a team is indexed twice; keep the team entry
+            if entry["team_id"] is None and entry["key"] in self._member_names:
+                continue
+            results.append({
+                "name": entry["name"],
+                "gender": entry["gender"],
+                "team_id": entry["team_id"],
+                "wave_id": self._team_waves.get(entry["team_id"]),
+                "match": "prefix" if score == 0 else "fuzzy",
+            })
+            if len(results) >= limit:
+                break
+        return results
+
+member_index = MemberSearchIndex()
+
+async def rebuild_member_index():
+    await poll_data_versions()
+    version, changes = data_versions["members"], member_index.changes
+    participants = await db.participants.find({}, {"_id": 0}).to_list(10000)
+    teams = await db.teams.find({}, {"_id": 0, "team_id": 1, "members": 1}).to_list(10000)
+    waves = await db.waves.find({}, {"_id": 0}).to_list(10000)
+    if member_index.changes != changes:
+        # A write through this worker landed mid-read and may be missing
+        # from it; the next poll tries again
+        return
+    member_index.clear()
+    member_index.replace_participants(participants)
+    member_index.replace_teams(teams, waves)
+    member_index.version = version
+
+@api_router.get("/search")
+async def search_members(q: str, limit: int = 20):
+    limit = max(1, min(limit, 100))
+    return {"query": q, "results": member_index.search(q, limit)}
+
+# --- Background Jobs ---
+# Heavy admin operations run as asyncio tasks and report progress to the
+# `jobs` collection. Destructive jobs are exclusive across all workers: they
+# hold the `admin` document in `locks`, and a second one is refused while it
+# is taken. Running jobs heartbeat their job and lock documents; a job whose
+# heartbeat goes stale (its worker died) is marked failed and its lock can be
+# taken over.
+MAX_CONCURRENT_JOBS = int(os.environ.get('MAX_CONCURRENT_JOBS', '2'))
+INSERT_BATCH_SIZE = 1000
+JOB_HEARTBEAT_SECONDS = 5
+JOB_STALE_SECONDS = 30
+ADMIN_LOCK_ID = "admin"
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _stale_before() -> str:
+    return datetime.fromtimestamp(time.time() - JOB_STALE_SECONDS, timezone.utc).isoformat()
+
+class JobProgress:
+    def __init__(self, runner: "JobRunner", job_id: str):
+        self._runner = runner
+        self.job_id = job_id
+
+    async def report(self, stage: str, done: int = 0, total: int = 0):
+        await self._runner.update(self.job_id, progress={"stage": stage, "done": done, "total": total})
+
+class JobRunner:
+    def __init__(self, max_concurrent: int):
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._tasks = {}
+
+    async def _acquire(self, owner: str, kind: str):
+        """Take the cross-worker admin lock or raise 409."""
+        from pymongo.errors import DuplicateKeyError
+        
+        for _attempt in range(2):
+            lock = {"owner": owner, "kind": kind, "heartbeat": _now_iso()}
+            try:
+                await db.locks.insert_one({"_id": ADMIN_LOCK_ID, **lock})
+                return
+            except DuplicateKeyError:
+                pass
+            # Take over a lock whose holder stopped heartbeating
+            if await db.locks.find_one_and_replace(
+                {"_id": ADMIN_LOCK_ID, "heartbeat": {"$lt": _stale_before()}}, lock
+            ):
+                return
+            current = await db.locks.find_one({"_id": ADMIN_LOCK_ID})
+            if current:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Another admin operation is still running ({current['kind']}, job {current['owner']})"
+                )
+            # Released in the meantime; try again
+        raise HTTPException(status_code=409, detail="Another admin operation is still running")
+
+    async def _release(self, owner: str):
+        await db.locks.delete_one({"_id": ADMIN_LOCK_ID, "owner": owner})
+
+    @asynccontextmanager
+    async def exclusive(self, kind: str):
+        """Hold the admin lock around a change made inside the request.
+
+        Meant for short operations: the lock isn't heartbeated, so it must be
+        released well within JOB_STALE_SECONDS.
+        """
+        owner = f"{kind}-{uuid.uuid4().hex}"
+        await self._acquire(owner, kind)
+        try:
+            yield
+        finally:
+            await self._release(owner)
+
+    async def submit(self, kind: str, work, mutating: bool = True) -> dict:
+        job_id = uuid.uuid4().hex
+        # Claim the lock before creating the job so concurrent clicks see it
+        if mutating:
+            await self._acquire(job_id, kind)
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "mutating": mutating,
+            "status": "queued",
+            "progress": {"stage": "queued", "done": 0, "total": 0},
+            "result": None,
+            "error": None,
+            "created_at": _now_iso(),
+            "updated_at": _now_iso(),
+            "heartbeat": _now_iso(),
+        }
+        try:
+            await db.jobs.insert_one(dict(job))
+        except Exception:
+            if mutating:
+                await self._release(job_id)
+            raise
+        self._tasks[job_id] = asyncio.create_task(self._run(job_id, work, mutating))
+        return job
+
+    async def update(self, job_id: str, **fields):
+        fields["updated_at"] = _now_iso()
+        await db.jobs.update_one({"job_id": job_id}, {"$set": fields})
+
+    async def _heartbeat(self, job_id: str, mutating: bool):
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            now = _now_iso()
+            try:
+                await db.jobs.update_one({"job_id": job_id}, {"$set": {"heartbeat": now}})
+                if mutating:
+                    await db.locks.update_one({"_id": ADMIN_LOCK_ID, "owner": job_id}, {"$set": {"heartbeat": now}})
+            except Exception as e:
+                logger.warning(f"Job {job_id} heartbeat failed: {e}")
+
+    async def _run(self, job_id: str, work, mutating: bool):
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, mutating))
+        try:
+            async with self._semaphore:
+                await self.update(job_id, status="running")
+                result = await work(JobProgress(self, job_id))
+            await self.update(job_id, status="succeeded", result=result)
+        except HTTPException as e:
+            await self.update(job_id, status="failed", error=e.detail)
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            await self.update(job_id, status="failed", error=str(e))
+        finally:
+            heartbeat.cancel()
+            if mutating:
+                await self._release(job_id)
+            self._tasks.pop(job_id, None)
+
+job_runner = JobRunner(MAX_CONCURRENT_JOBS)
+
+def job_response(job: dict, message: str, **extra) -> dict:
+    return {"job_id": job["job_id"], "status": job["status"], "message": message, **extra}
+
+async def fail_stale_jobs():
+    """Mark jobs whose worker stopped heartbeating as failed."""
+    await db.jobs.update_many(
+        {
+            "status": {"$in": ["queued", "running"]},
+            "$or": [{"heartbeat": {"$lt": _stale_before()}}, {"heartbeat": {"$exists": False}}],
+        },
+        {"$set": {"status": "failed", "error": "Interrupted by server restart", "updated_at": _now_iso()}}
+    )
+
+async def watch_stale_jobs():
+    while True:
+        try:
+            await fail_stale_jobs()
+        except Exception as e:
+            logger.warning(f"Stale job check failed: {e}")
+        await asyncio.sleep(JOB_STALE_SECONDS)
+
+async def insert_in_batches(collection, docs: List[dict], progress: JobProgress, stage: str):
+    total = len(docs)
+    for start in range(0, total, INSERT_BATCH_SIZE):
+        await collection.insert_many(docs[start:start + INSERT_BATCH_SIZE])
+        await progress.report(stage, min(start + INSERT_BATCH_SIZE, total), total)
+
+async def clear_event_data(progress: JobProgress, collections: List[str]):
+    for i, name in enumerate(collections):
+        await progress.report(f"clearing {name}", i, len(collections))
+        await db[name].delete_many({})
+
+@api_router.get("/jobs")
+async def list_jobs(limit: int = 20, _=Depends(verify_token)):
+    limit = max(1, min(limit, 100))
+    jobs = await db.jobs.find({}, {"_id": 0}).sort("created_at", -1).limit(limit).to_list(limit)
+    return {"jobs": jobs}
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str, _=Depends(verify_token)):
+    job = await db.jobs.find_one({"job_id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
 # --- Participants ---
-@api_router.post("/participants/upload")
+@api_router.post("/participants/upload", status_code=202)
 async def upload_participants(file: UploadFile = File(...), _=Depends(verify_token)):
     content = await file.read()
     text = content.decode("utf-8")
@@ -109,43 +1018,45 @@ async def upload_participants(file: UploadFile = File(...), _=Depends(verify_tok
     if not participants:
         raise HTTPException(status_code=400, detail="No valid participants found in CSV")
     
-    # Clear existing participants and teams
-    await db.participants.delete_many({})
-    await db.teams.delete_many({})
-    await db.waves.delete_many({})
-    await db.settings.delete_many({})
-    
-    await db.participants.insert_many(participants)
-    
     total = len(participants)
     males = sum(1 for p in participants if p["gender"] == "M")
     females = total - males
+    summary = {"total": total, "males": males, "females": females}
+    
+    async def work(progress: JobProgress):
+        # Clear existing participants and teams
+        await clear_event_data(progress, ["participants", "teams", "waves", "settings", "rank_history"])
+        await insert_in_batches(db.participants, participants, progress, "inserting participants")
+        member_index.replace_participants(participants)
+        member_index.replace_teams([], [])
+        projection_cache.invalidate()
+        await rank_history.reload()
+        await public_data_changed(members=True)
+        return {**summary, "message": f"Uploaded {total} participants"}
     
-    return {"total": total, "males": males, "females": females, "message": f"Uploaded {total} participants"}
+    job = await job_runner.submit("upload_participants", work)
+    return job_response(job, f"Uploading {total} participants", **summary)
 
 @api_router.get("/participants/summary")
-async def get_participants_summary():
-    participants = await db.participants.find({}, {"_id": 0}).to_list(10000)
+async def get_participants_summary(source=Depends(read_db)):
+    participants = await source.participants.find({}, {"_id": 0}).to_list(10000)
     total = len(participants)
     males = sum(1 for p in participants if p["gender"] == "M")
     females = total - males
-    return {"total": total, "males": males, "females": females, "participants": participants}
+    checked_in = sum(1 for p in participants if p.get("checked_in") is True)
+    absent = sum(1 for p in participants if p.get("checked_in") is False)
+    return {
+        "total": total, "males": males, "females": females,
+        "checked_in": checked_in, "absent": absent, "participants": participants
+    }
 
 # --- Teams & Waves ---
-@api_router.post("/teams/generate")
-async def generate_teams(req: GenerateTeamsRequest, _=Depends(verify_token)):
-    participants = await db.participants.find({}, {"_id": 0}).to_list(10000)
-    if not participants:
-        raise HTTPException(status_code=400, detail="No participants uploaded yet")
-    
-    await db.teams.delete_many({})
-    await db.waves.delete_many({})
-    await db.settings.delete_many({})
-    
+def build_teams(participants: List[dict], mode: str):
+    """Split participants into teams of 3 and group the teams into waves."""
     teams = []
     team_id = 1
     
-    if req.mode == "2m1f":
+    if mode == "2m1f":
         males = [p for p in participants if p["gender"] == "M"]
         females = [p for p in participants if p["gender"] == "F"]
         random.shuffle(males)
@@ -153,11 +1064,7 @@ async def generate_teams(req: GenerateTeamsRequest, _=Depends(verify_token)):
         
         while len(males) >= 2 and len(females) >= 1:
             members = [males.pop(), males.pop(), females.pop()]
-            teams.append({
-                "team_id": team_id,
-                "members": [{"name": m["name"], "gender": m["gender"]} for m in members],
-                "station_times": {}
-            })
+            teams.append(new_team_doc(team_id, members))
             team_id += 1
         
         # Remaining participants
@@ -165,41 +1072,22 @@ async def generate_teams(req: GenerateTeamsRequest, _=Depends(verify_token)):
         random.shuffle(remaining)
         while len(remaining) >= 3:
             group = [remaining.pop() for _ in range(3)]
-            teams.append({
-                "team_id": team_id,
-                "members": [{"name": m["name"], "gender": m["gender"]} for m in group],
-                "station_times": {}
-            })
+            teams.append(new_team_doc(team_id, group))
             team_id += 1
         
         # If any left over (1-2 people), make a smaller team
         if remaining:
-            teams.append({
-                "team_id": team_id,
-                "members": [{"name": m["name"], "gender": m["gender"]} for m in remaining],
-                "station_times": {}
-            })
+            teams.append(new_team_doc(team_id, remaining))
     else:
         # Random teams
         shuffled = participants[:]
         random.shuffle(shuffled)
         while len(shuffled) >= 3:
             group = [shuffled.pop() for _ in range(3)]
-            teams.append({
-                "team_id": team_id,
-                "members": [{"name": m["name"], "gender": m["gender"]} for m in group],
-                "station_times": {}
-            })
+            teams.append(new_team_doc(team_id, group))
             team_id += 1
         if shuffled:
-            teams.append({
-                "team_id": team_id,
-                "members": [{"name": m["name"], "gender": m["gender"]} for m in shuffled],
-                "station_times": {}
-            })
-    
-    if teams:
-        await db.teams.insert_many(teams)
+            teams.append(new_team_doc(team_id, shuffled))
     
     # Create waves (3 teams per wave)
     waves = []
@@ -212,21 +1100,45 @@ async def generate_teams(req: GenerateTeamsRequest, _=Depends(verify_token)):
         })
         wave_id += 1
     
-    if waves:
-        await db.waves.insert_many(waves)
+    return teams, waves
+
+@api_router.post("/teams/generate", status_code=202)
+async def generate_teams(req: GenerateTeamsRequest, _=Depends(verify_token)):
+    if not await db.participants.count_documents({}, limit=1):
+        raise HTTPException(status_code=400, detail="No participants uploaded yet")
+    
+    async def work(progress: JobProgress):
+        participants = await db.participants.find({}, {"_id": 0}).to_list(10000)
+        if not participants:
+            raise HTTPException(status_code=400, detail="No participants uploaded yet")
+        
+        await clear_event_data(progress, ["teams", "waves", "settings", "rank_history"])
+        teams, waves = build_teams(participants, req.mode)
+        await insert_in_batches(db.teams, teams, progress, "inserting teams")
+        await insert_in_batches(db.waves, waves, progress, "inserting waves")
+        member_index.replace_teams(teams, waves)
+        projection_cache.invalidate()
+        await rank_history.reload()
+        await public_data_changed(members=True)
+        
+        return {"teams_count": len(teams), "waves_count": len(waves), "message": f"Generated {len(teams)} teams in {len(waves)} waves"}
     
-    return {"teams_count": len(teams), "waves_count": len(waves), "message": f"Generated {len(teams)} teams in {len(waves)} waves"}
+    job = await job_runner.submit("generate_teams", work)
+    return job_response(job, f"Generating teams ({req.mode})")
 
 @api_router.get("/teams")
-async def get_teams():
-    teams = await db.teams.find({}, {"_id": 0}).to_list(10000)
-    return {"teams": teams}
+async def get_teams(source=Depends(read_db)):
+    teams = await source.teams.find({}, {"_id": 0}).to_list(10000)
+    return {"teams": [present_team(t) for t in teams]}
 
 @api_router.get("/waves")
-async def get_waves():
-    waves = await db.waves.find({}, {"_id": 0}).to_list(10000)
-    teams = await db.teams.find({}, {"_id": 0}).to_list(10000)
-    teams_map = {t["team_id"]: t for t in teams}
+async def get_waves(source=Depends(read_db)):
+    waves = await source.waves.find({}, {"_id": 0}).to_list(10000)
+    teams = await source.teams.find({}, {"_id": 0}).to_list(10000)
+    return build_waves_view(waves, teams)
+
+def build_waves_view(waves: List[dict], teams: List[dict]) -> dict:
+    teams_map = {t["team_id"]: present_team(t) for t in teams}
     
     result = []
     for wave in waves:
@@ -256,31 +1168,379 @@ async def edit_team(team_id: int, req: EditTeamRequest, _=Depends(verify_token))
         {"team_id": team_id},
         {"$set": {"members": members}}
     )
+    member_index.set_team_members(team_id, members)
+    await public_data_changed(members=True)
     return {"message": f"Team {team_id} updated", "team_id": team_id, "members": members}
 
+# --- Check-in & Team Repair ---
+# No-shows are taken out of their teams and the gaps are closed in place:
+# short teams are topped up from checked-in participants who are not on a
+# team, then by dissolving the smallest short teams into the larger ones.
+# Teams that have recorded a time are never touched, and only the teams and
+# waves that change are written.
+TEAM_SIZE = 3
+WAVE_SIZE = 3
+
+def _males(members: List[dict]) -> int:
+    return sum(1 for m in members if m["gender"] == "M")
+
+def _fill_team(members: List[dict], donors: dict, top_up: bool = True) -> int:
+    """Top members up to TEAM_SIZE from donors {"M": [...], "F": [...]}.
+
+    The slots that restore 2m1f are filled first; with top_up=False only
+    those. Returns how many were added.
+    """
+    before = len(members)
+    males = _males(members)
+    for gender, need in (("F", 1 - (len(members) - males)), ("M", 2 - males)):
+        while need > 0 and len(members) < TEAM_SIZE and donors[gender]:
+            members.append(donors[gender].pop())
+            need -= 1
+    while top_up and len(members) < TEAM_SIZE and (donors["M"] or donors["F"]):
+        gender = "M" if len(donors["M"]) >= len(donors["F"]) else "F"
+        members.append(donors[gender].pop())
+    return len(members) - before
+
+def _restore_order(members: List[dict]) -> tuple:
+    # Teams missing the fewest members, then the most men, restore 2m1f first
+    return TEAM_SIZE - len(members), -_males(members)
+
+def _restored_count(kept: dict, donor_males: int, donor_females: int) -> int:
+    """How many kept teams end up 2m1f when the donors restore them in
+    _restore_order. `kept` maps (size, males) to a number of teams."""
+    restored = 0
+    for size, males in sorted(kept, key=lambda t: (TEAM_SIZE - t[0], -t[1])):
+        count = kept[(size, males)]
+        need_m, need_f = 2 - males, 1 - (size - males)
+        if need_m < 0 or need_f < 0:
+            continue
+        done = count
+        if need_f:
+            done = min(done, donor_females // need_f)
+        if need_m:
+            done = min(done, donor_males // need_m)
+        restored += done
+        donor_females -= min(count * need_f, donor_females)
+        donor_males -= min(count * need_m, donor_males)
+    return restored
+
+def _choose_receivers(short: List[int], members_of: dict, full_teams: int, pool: List[dict]) -> List[int]:
+    """Pick the short teams to keep and fill; the others are dissolved.
+
+    Larger teams are always kept, so the fewest members move. Among the teams
+    of the size at the cut, the gender mix kept is the one whose dissolved
+    members restore 2m1f in the most kept teams, staying as close as possible
+    to keeping the lowest team ids.
+    """
+    if not 0 < full_teams < len(short):
+        return short[:full_teams]
+    cut = len(members_of[short[full_teams - 1]])
+    fixed = [tid for tid in short if len(members_of[tid]) > cut]
+    tier = defaultdict(list)              # males -> tids of size `cut`
+    for tid in short:
+        if len(members_of[tid]) == cut:
+            tier[_males(members_of[tid])].append(tid)
+    slots = full_teams - len(fixed)
+    kinds = sorted(tier)
+
+    everyone = [m for tid in short for m in members_of[tid]] + pool
+    total_males = _males(everyone)
+    total_females = len(everyone) - total_males
+    fixed_kept = Counter((len(members_of[tid]), _males(members_of[tid])) for tid in fixed)
+    default = Counter(_males(members_of[tid]) for tid in short[len(fixed):full_teams])
+
+    best = None
+    for head in product(*(range(len(tier[k]) + 1) for k in kinds[:-1])):
+        last = slots - sum(head)
+        if not 0 <= last <= len(tier[kinds[-1]]):
+            continue
+        counts = dict(zip(kinds, head + (last,)))
+        kept = fixed_kept + Counter({(cut, k): n for k, n in counts.items() if n})
+        kept_males = sum(males * n for (_, males), n in kept.items())
+        kept_members = sum(size * n for (size, _), n in kept.items())
+        score = (
+            -_restored_count(kept, total_males - kept_males, total_females - (kept_members - kept_males)),
+            sum(abs(counts[k] - default[k]) for k in kinds),
+        )
+        if best is None or score < best[0]:
+            best = (score, counts)
+
+    receivers = fixed + [tid for k in kinds for tid in tier[k][:best[1][k]]]
+    return sorted(receivers, key=lambda tid: (-len(members_of[tid]), tid))
+
+def repair_teams(teams: List[dict], waves: List[dict], participants: List[dict]) -> dict:
+    """Plan the smallest set of team and wave changes after check-in.
+
+    Members marked absent are removed. Then the short teams plus the unplaced
+    checked-in participants are regrouped: the largest short teams are kept
+    and filled, so the members that have to move are the ones in the smallest
+    teams, and among equally short teams the ones dissolved are those whose
+    members complete 2m1f in the others (see _choose_receivers). As with
+    build_teams, at most one team of 1-2 is left over.
+    """
+    absent = defaultdict(int)
+    for p in participants:
+        if p.get("checked_in") is False:
+            absent[p["name"]] += 1
+    
+    teams_by_id = {t["team_id"]: t for t in teams}
+    started = {t["team_id"] for t in teams if any(v is not None for v in team_times(t))}
+    members_of = {}
+    removed, skipped = [], []
+    for team in teams:
+        tid = team["team_id"]
+        keep = []
+        for m in team["members"]:
+            if absent[m["name"]] > 0:
+                absent[m["name"]] -= 1
+                if tid not in started:
+                    removed.append({**m, "team_id": tid})
+                    continue
+                skipped.append(tid)
+            keep.append(m)
+        members_of[tid] = keep
+    
+    # Checked-in participants who are not on any team (e.g. marked absent
+    # earlier and then turned up)
+    unplaced = defaultdict(int)
+    for p in participants:
+        unplaced[p["name"]] += 1
+    for members in members_of.values():
+        for m in members:
+            unplaced[m["name"]] -= 1
+    pool = []
+    # Before teams are generated there is nothing to repair: generate_teams
+    # seats everyone, so check-in must not start building teams itself
+    if teams:
+        for p in participants:
+            if p.get("checked_in") is True and unplaced[p["name"]] > 0:
+                unplaced[p["name"]] -= 1
+                pool.append({"name": p["name"], "gender": p["gender"]})
+    
+    short = sorted(
+        (tid for tid, members in members_of.items() if len(members) < TEAM_SIZE and tid not in started),
+        key=lambda tid: (-len(members_of[tid]), tid)
+    )
+    total = sum(len(members_of[tid]) for tid in short) + len(pool)
+    full_teams, leftover_size = divmod(total, TEAM_SIZE)
+    receivers = _choose_receivers(short, members_of, full_teams, pool)
+    rest = [tid for tid in short if tid not in receivers]
+    leftover = rest.pop(0) if rest and leftover_size else None
+    
+    donors = {"M": [], "F": []}
+    moved = 0
+    for tid in rest:
+        for m in members_of[tid]:
+            donors[m["gender"]].append(m)
+        moved += len(members_of[tid])
+    if leftover is not None:
+        extra = members_of[leftover][leftover_size:]
+        members_of[leftover] = members_of[leftover][:leftover_size]
+        for m in extra:
+            donors[m["gender"]].append(m)
+        moved += len(extra)
+    # pop() takes from the end, so unplaced participants are seated first
+    for p in pool:
+        donors[p["gender"]].append(p)
+    
+    changed = {tid for tid in members_of if len(members_of[tid]) != len(teams_by_id[tid]["members"])}
+    # Restore 2m1f in every kept team before topping any up, so a scarce
+    # gender goes to a team it completes
+    restore_first = sorted(receivers, key=lambda tid: (*_restore_order(members_of[tid]), tid))
+    extra = [leftover] if leftover is not None else []
+    for top_up, order in ((False, restore_first + extra), (True, receivers + extra)):
+        for tid in order:
+            if _fill_team(members_of[tid], donors, top_up=top_up):
+                changed.add(tid)
+    
+    next_id = max(teams_by_id, default=0) + 1
+    created = []
+    while donors["M"] or donors["F"]:
+        members = []
+        _fill_team(members, donors)
+        members_of[next_id] = members
+        created.append(next_id)
+        next_id += 1
+    
+    dissolved = set(rest)
+    changed -= dissolved
+    
+    # Waves: drop dissolved teams, then seat new teams in the last wave and
+    # new waves after it
+    wave_updates, wave_deletes = {}, []
+    for wave in waves:
+        if dissolved.intersection(wave["team_ids"]):
+            team_ids = [tid for tid in wave["team_ids"] if tid not in dissolved]
+            if team_ids:
+                wave_updates[wave["wave_id"]] = team_ids
+            else:
+                wave_deletes.append(wave["wave_id"])
+    remaining = [w for w in waves if w["wave_id"] not in wave_deletes]
+    last = max(remaining, key=lambda w: w["wave_id"], default=None)
+    next_wave_id = max((w["wave_id"] for w in waves), default=0) + 1
+    new_waves = []
+    for tid in created:
+        if last is not None:
+            team_ids = wave_updates.get(last["wave_id"], last["team_ids"])
+            if len(team_ids) < WAVE_SIZE:
+                wave_updates[last["wave_id"]] = team_ids + [tid]
+                continue
+        last = {"wave_id": next_wave_id, "team_ids": [tid]}
+        new_waves.append(last)
+        wave_updates[next_wave_id] = last["team_ids"]
+        next_wave_id += 1
+    
+    new_wave_ids = {w["wave_id"] for w in new_waves}
+    return {
+        "updated": {tid: members_of[tid] for tid in sorted(changed)},
+        "created": [new_team_doc(tid, members_of[tid]) for tid in created],
+        "dissolved": sorted(dissolved),
+        "wave_updates": {wid: tids for wid, tids in wave_updates.items() if wid not in new_wave_ids},
+        "wave_creates": [{"wave_id": w["wave_id"], "team_ids": wave_updates[w["wave_id"]]} for w in new_waves],
+        "wave_deletes": wave_deletes,
+        "removed_members": removed,
+        "skipped_started_teams": sorted(set(skipped)),
+        "placed": len(pool),
+        "moved": moved,
+    }
+
+async def apply_team_repair(plan: dict):
+    from pymongo import UpdateOne
+    
+    team_ops = [UpdateOne({"team_id": tid}, {"$set": {"members": members}}) for tid, members in plan["updated"].items()]
+    if team_ops:
+        await db.teams.bulk_write(team_ops, ordered=False)
+    if plan["dissolved"]:
+        await db.teams.delete_many({"team_id": {"$in": plan["dissolved"]}})
+    if plan["created"]:
+        await db.teams.insert_many([dict(t) for t in plan["created"]])
+    
+    wave_ops = [UpdateOne({"wave_id": wid}, {"$set": {"team_ids": tids}}) for wid, tids in plan["wave_updates"].items()]
+    if wave_ops:
+        await db.waves.bulk_write(wave_ops, ordered=False)
+    if plan["wave_deletes"]:
+        await db.waves.delete_many({"wave_id": {"$in": plan["wave_deletes"]}})
+    if plan["wave_creates"]:
+        await db.waves.insert_many([dict(w) for w in plan["wave_creates"]])
+    
+    for tid, members in plan["updated"].items():
+        member_index.set_team_members(tid, members)
+    for tid in plan["dissolved"]:
+        member_index.remove_team(tid)
+    for team in plan["created"]:
+        member_index.set_team_members(team["team_id"], team["members"])
+    for wid, tids in plan["wave_updates"].items():
+        member_index.set_wave({"wave_id": wid, "team_ids": tids})
+    for wave in plan["wave_creates"]:
+        member_index.set_wave(wave)
+    if plan["dissolved"] or plan["created"]:
+        # The set of teams changed: the projection cache rebuilds on next use,
+        # and a keyframe brings every worker's rank view up to date
+        projection_cache.invalidate()
+        await rank_history.reload()
+    if any(plan[k] for k in ("updated", "created", "dissolved")):
+        await public_data_changed(members=True)
+
+def repair_summary(plan: dict) -> dict:
+    return {
+        "updated_team_ids": list(plan["updated"]),
+        "created_team_ids": [t["team_id"] for t in plan["created"]],
+        "dissolved_team_ids": plan["dissolved"],
+        "changed_wave_ids": sorted([*plan["wave_updates"], *(w["wave_id"] for w in plan["wave_creates"])]),
+        "deleted_wave_ids": plan["wave_deletes"],
+        "removed_members": plan["removed_members"],
+        "skipped_started_teams": plan["skipped_started_teams"],
+        "placed": plan["placed"],
+        "moved": plan["moved"],
+    }
+
+# Queues check-ins on this worker; the admin lock (job_runner.exclusive)
+# keeps repairs and upload/generate/reset jobs on any worker apart
+team_repair_lock = asyncio.Lock()
+
+async def run_team_repair(participants: List[dict]) -> dict:
+    teams = await db.teams.find({}, {"_id": 0}).to_list(10000)
+    waves = await db.waves.find({}, {"_id": 0}).to_list(10000)
+    plan = repair_teams(teams, waves, participants)
+    await apply_team_repair(plan)
+    return repair_summary(plan)
+
+@api_router.post("/participants/checkin")
+async def check_in_participants(req: CheckInRequest, _=Depends(verify_token)):
+    async with team_repair_lock, job_runner.exclusive("team_repair"):
+        participants = await db.participants.find({}, {"_id": 0}).to_list(10000)
+        names = defaultdict(list)
+        for p in participants:
+            names[p["name"].strip().lower()].append(p)
+        
+        # Matched case-insensitively; errors echo the names as given
+        present = {n.strip().lower(): n.strip() for n in req.present if n.strip()}
+        absent = {n.strip().lower(): n.strip() for n in req.absent if n.strip()}
+        both = sorted(present[key] for key in present.keys() & absent.keys())
+        if both:
+            raise HTTPException(status_code=400, detail=f"Marked both present and absent: {', '.join(both)}")
+        not_found = sorted(raw for key, raw in {**present, **absent}.items() if key not in names)
+        
+        for keys, checked_in in ((present, True), (absent, False)):
+            matched = [p for key in keys for p in names.get(key, [])]
+            if matched:
+                await db.participants.update_many(
+                    {"name": {"$in": list({p["name"] for p in matched})}},
+                    {"$set": {"checked_in": checked_in}}
+                )
+                for p in matched:
+                    p["checked_in"] = checked_in
+        if req.absent_unchecked:
+            await db.participants.update_many({"checked_in": {"$exists": False}}, {"$set": {"checked_in": False}})
+            for p in participants:
+                p.setdefault("checked_in", False)
+        
+        result = {
+            "checked_in": sum(1 for p in participants if p.get("checked_in") is True),
+            "absent": sum(1 for p in participants if p.get("checked_in") is False),
+            "not_found": not_found,
+        }
+        if req.repair:
+            result["repair"] = await run_team_repair(participants)
+    return result
+
+@api_router.post("/teams/repair")
+async def repair_teams_endpoint(_=Depends(verify_token)):
+    async with team_repair_lock, job_runner.exclusive("team_repair"):
+        participants = await db.participants.find({}, {"_id": 0}).to_list(10000)
+        return await run_team_repair(participants)
+
 # --- Time Entry ---
 @api_router.post("/times/save")
 async def save_time(req: SaveTimeRequest, _=Depends(verify_token)):
-    if req.station not in STATIONS:
-        raise HTTPException(status_code=400, detail=f"Invalid station: {req.station}")
-    
-    # Validate MM:SS format
-    parts = req.time_str.split(":")
-    if len(parts) != 2:
-        raise HTTPException(status_code=400, detail="Time must be in MM:SS format")
+    config = station_config
+    idx, value = config.parse(req.station, req.time_str)
     try:
-        minutes = int(parts[0])
-        seconds = int(parts[1])
-        if minutes < 0 or seconds < 0 or seconds > 59:
-            raise ValueError
-        total_seconds = minutes * 60 + seconds
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid time format. Use MM:SS")
+        await rank_history.prepare()
+    except Exception:
+        logger.exception("Rank history not loaded")
     
-    await db.teams.update_one(
-        {"team_id": req.team_id},
-        {"$set": {f"station_times.{req.station}": {"time_str": req.time_str, "total_seconds": total_seconds}}}
-    )
+    if COMPACT_STATION_TIMES:
+        await save_compact_time(req.team_id, idx, value)
+    else:
+        # Timed stations keep the judge's own MM:SS string, as before
+        display = req.time_str if config.units[idx] == "time" else None
+        result = await db.teams.update_one(
+            {"team_id": req.team_id, "times": {"$exists": False}},
+            {"$set": {f"station_times.{req.station}": station_entry(idx, value, display)}}
+        )
+        if not result.matched_count:
+            # Already migrated to the array schema (the migration can run
+            # before STATION_TIMES_SCHEMA is switched); readers ignore
+            # station_times once `times` exists
+            await save_compact_time(req.team_id, idx, value)
+    try:
+        await rank_history.record(req.team_id, idx)
+    except Exception:
+        # The time is saved; history catches up from the next keyframe
+        logger.exception(f"Rank history not recorded for team {req.team_id}")
+        rank_history.reset()
+    await public_data_changed()
     
     return {"message": f"Saved {req.time_str} for Team {req.team_id} at {req.station}"}
 
@@ -299,11 +1559,12 @@ async def set_active(req: SetActiveRequest, _=Depends(verify_token)):
             {"$set": update},
             upsert=True
         )
+        await public_data_changed()
     return {"message": "Active settings updated"}
 
 @api_router.get("/settings/active")
-async def get_active():
-    settings = await db.settings.find_one({"key": "active"}, {"_id": 0})
+async def get_active(source=Depends(read_db)):
+    settings = await source.settings.find_one({"key": "active"}, {"_id": 0})
     if not settings:
         return {"active_wave_id": None, "active_station": None}
     return {
@@ -311,16 +1572,137 @@ async def get_active():
         "active_station": settings.get("active_station")
     }
 
+# --- Projections ---
+MIN_COMPLETED_FOR_PROJECTION = 3
+PACE_BOUNDS = (0.5, 2.0)
+CONFIDENCE_Z = 1.96  # 95% interval
+NO_PROJECTION = {
+    "projected_seconds": None,
+    "projected_time_str": "--:--",
+    "projected_rank": None,
+    "projected_low_seconds": None,
+    "projected_high_seconds": None,
+}
+
+class ProjectionCache:
+    """Projected finish times for teams that are part-way through the race.
+
+    Projections are computed from the team documents the caller is about to
+    show, so they always match the leaderboard they are attached to, and are
+    reused while those documents are unchanged. Callers that read the primary
+    pass the data version they read at, which is enough to reuse the result;
+    anything else (e.g. documents read from a lagging secondary) is compared
+    against the times the result was computed from.
+
+    Each station's expected time is the median over teams that finished every
+    station (or over every recorded time until enough teams have finished),
+    scaled by the team's own pace relative to those medians so far. The
+    (teams x stations) matrix is only built, and the projections computed in
+    a single vectorised pass, when something changed.
+    """
+
+    def __init__(self):
+        self._row = None      # team_id -> row index of the last computed result
+        self._times = None    # per-team times tuples it was computed from
+        self._time_indices = []
+        self._version = None
+        self._result = None
+
+    def invalidate(self):
+        self._row = None
+        self._times = None
+        self._version = None
+        self._result = None
+
+    def projections(self, teams: List[dict], data_version: Optional[int] = None) -> dict:
+        """Return {team_id: projection dict} for exactly these teams.
+
+        data_version: the data_versions["public"] value read before `teams`
+        were fetched from db; leave it out for any other source.
+        """
+        row = {t["team_id"]: i for i, t in enumerate(teams)}
+        time_indices = station_config.time_indices
+        times = None
+        if self._result is not None and row == self._row and time_indices == self._time_indices:
+            if data_version is not None and data_version == self._version:
+                return self._result
+            # Tuples, so later edits to the documents can't change the copy
+            times = [tuple(team_times(t)) for t in teams]
+            if times == self._times:
+                self._version = data_version
+                return self._result
+        self._row, self._time_indices, self._version = row, time_indices, data_version
+        self._times = times if times is not None else [tuple(team_times(t)) for t in teams]
+        self._result = self._compute()
+        return self._result
+
+    def _compute(self) -> dict:
+        import numpy as np
+        
+        # None becomes NaN under a float dtype
+        matrix = np.array(self._times, dtype=float).reshape(len(self._times), len(station_config.names))
+        # Reps/distance stations don't add to the race time
+        times = matrix[:, self._time_indices]
+        if not times.shape[1]:
+            return {team_id: NO_PROJECTION for team_id in self._row}
+        if not len(times):
+            return {}
+        done = ~np.isnan(times)
+        completed = done.all(axis=1)
+        reference = times[completed] if completed.sum() >= MIN_COMPLETED_FOR_PROJECTION else times
+
+        with warnings.catch_warnings():
+            # Stations nobody has run yet produce all-NaN columns
+            warnings.simplefilter("ignore", RuntimeWarning)
+            medians = np.nanmedian(reference, axis=0)
+            variances = np.nanvar(reference, axis=0)
+            pace = np.nanmean(times / medians, axis=1)
+        pace = np.clip(np.nan_to_num(pace, nan=1.0), *PACE_BOUNDS)
+
+        missing = ~done
+        remaining = pace * np.where(missing, medians, 0).sum(axis=1)
+        spread = CONFIDENCE_Z * pace * np.sqrt(np.where(missing, variances, 0).sum(axis=1))
+        projected = np.nansum(times, axis=1) + remaining
+        # No projection for teams that have not started, or that still have
+        # to run a station no one has a time for yet
+        projected[~done.any(axis=1) | np.isnan(projected)] = np.nan
+
+        order = np.argsort(projected, kind="stable")  # NaN sorts last
+        ranks = np.empty(len(order), dtype=int)
+        ranks[order] = np.arange(1, len(order) + 1)
+
+        valid = ~np.isnan(projected)
+        totals = np.rint(np.where(valid, projected, 0)).astype(int).tolist()
+        halves = np.rint(np.where(valid, spread, 0)).astype(int).tolist()
+        ranks = ranks.tolist()
+        valid = valid.tolist()
+
+        result = {}
+        for team_id, row in self._row.items():
+            if not valid[row]:
+                result[team_id] = NO_PROJECTION
+                continue
+            total = totals[row]
+            result[team_id] = {
+                "projected_seconds": total,
+                "projected_time_str": format_seconds(total),
+                "projected_rank": ranks[row],
+                "projected_low_seconds": total - halves[row],
+                "projected_high_seconds": total + halves[row],
+            }
+        return result
+
+projection_cache = ProjectionCache()
+
 # --- Leaderboard ---
-@api_router.get("/leaderboard")
-async def get_leaderboard():
-    teams = await db.teams.find({}, {"_id": 0}).to_list(10000)
-    settings = await db.settings.find_one({"key": "active"}, {"_id": 0})
+def build_leaderboard(teams: List[dict], waves: List[dict], settings: Optional[dict],
+                      data_version: Optional[int] = None) -> dict:
+    """data_version: as for ProjectionCache.projections."""
+    config = station_config
     active_wave_id = settings.get("active_wave_id") if settings else None
     active_station = settings.get("active_station") if settings else None
     
     # Get wave info for each team
-    waves = await db.waves.find({}, {"_id": 0}).to_list(10000)
     team_wave_map = {}
     active_team_ids = set()
     for wave in waves:
@@ -329,47 +1711,41 @@ async def get_leaderboard():
         if wave["wave_id"] == active_wave_id:
             active_team_ids = set(wave["team_ids"])
     
+    projections = projection_cache.projections(teams, data_version)
+    
     leaderboard = []
     for team in teams:
-        station_times = team.get("station_times", {})
-        total_seconds = 0
-        completed_stations = 0
-        current_station = "Not Started"
-        
-        for station in STATIONS:
-            if station in station_times:
-                total_seconds += station_times[station]["total_seconds"]
-                completed_stations += 1
+        times = team_times(team)
+        total_seconds = config.total_seconds(times)
+        completed_stations = sum(1 for t in times if t is not None)
         
         # Determine current station
         if completed_stations == 0:
             current_station = "Not Started"
-        elif completed_stations >= len(STATIONS):
+        elif completed_stations >= len(config.names):
             current_station = "Finished"
         else:
-            current_station = STATIONS[completed_stations]
+            current_station = config.names[completed_stations]
         
-        # Format total time
-        mins = total_seconds // 60
-        secs = total_seconds % 60
-        total_time_str = f"{mins:02d}:{secs:02d}" if total_seconds > 0 else "--:--"
+        total_time_str = format_seconds(total_seconds) if total_seconds > 0 else "--:--"
         
         leaderboard.append({
             "team_id": team["team_id"],
             "members": team["members"],
-            "station_times": station_times,
+            "station_times": team["station_times"] if "times" not in team else station_times_map(times),
             "current_station": current_station,
             "total_seconds": total_seconds,
             "total_time_str": total_time_str,
             "completed_stations": completed_stations,
             "is_active": team["team_id"] in active_team_ids,
-            "wave_id": team_wave_map.get(team["team_id"])
+            "wave_id": team_wave_map.get(team["team_id"]),
+            **projections[team["team_id"]]
         })
     
     # Sort: teams with times first (by total_seconds asc), then teams with no times
     with_times = [t for t in leaderboard if t["total_seconds"] > 0]
     without_times = [t for t in leaderboard if t["total_seconds"] == 0]
-    with_times.sort(key=lambda x: x["total_seconds"])
+    with_times.sort(key=lambda x: (x["total_seconds"], x["team_id"]))
     without_times.sort(key=lambda x: x["team_id"])
     
     sorted_lb = with_times + without_times
@@ -380,21 +1756,649 @@ async def get_leaderboard():
         "leaderboard": sorted_lb,
         "active_wave_id": active_wave_id,
         "active_station": active_station,
-        "stations": STATIONS
+        "stations": config.names
     }
 
+@api_router.get("/leaderboard")
+async def get_leaderboard(source=Depends(read_db)):
+    data_version = data_versions["public"] if source is db else None
+    teams = await source.teams.find({}, {"_id": 0}).to_list(10000)
+    settings = await source.settings.find_one({"key": "active"}, {"_id": 0})
+    waves = await source.waves.find({}, {"_id": 0}).to_list(10000)
+    return build_leaderboard(teams, waves, settings, data_version)
+
 @api_router.get("/stations")
 async def get_stations():
-    return {"stations": STATIONS}
+    return {
+        "stations": station_config.names,
+        "definitions": station_config.describe(),
+        "version": station_config.version
+    }
+
+@api_router.put("/stations")
+async def set_stations(req: StationConfigRequest, _=Depends(verify_token)):
+    definitions = validate_station_definitions(req.stations)
+    # Holding the admin lock keeps upload/generate/reset jobs out meanwhile
+    async with job_runner.exclusive("stations"):
+        # Stored times are keyed by station name/position, so the layout can
+        # only change before any results are in
+        has_times = await db.teams.count_documents({"$or": [
+            {"station_times": {"$exists": True, "$ne": {}}},
+            {"times": {"$elemMatch": {"$ne": None}}},
+        ]}, limit=1)
+        if has_times:
+            raise HTTPException(status_code=409, detail="Stations cannot change once times are recorded; reset or regenerate teams first")
+        
+        version = station_config.version + 1
+        current = await db.event_config.find_one({"key": "stations"}, {"_id": 0, "version": 1})
+        if current:
+            version = max(version, current["version"] + 1)
+        await db.event_config.update_one(
+            {"key": "stations"},
+            {"$set": {"stations": definitions, "version": version, "updated_at": _now_iso()}},
+            upsert=True
+        )
+        # Compact-schema teams need arrays sized for the new station count;
+        # a time saved since the check above is left alone, not wiped
+        await db.teams.update_many(
+            {"times": {"$type": "array", "$not": {"$elemMatch": {"$ne": None}}}},
+            {"$set": {"times": [None] * len(definitions)}}
+        )
+        apply_station_config(definitions, version)
+    return {"stations": station_config.names, "version": version, "message": f"Saved {len(definitions)} stations"}
+
+# --- Rank History ---
+# A time write changes one team's total. Each event stores that team's new
+# total (read back from the database after the write) along with the move it
+# caused (from_rank -> to_rank); every RANK_KEYFRAME_INTERVAL seqs a keyframe
+# with the full order and totals is stored, so any point in the event is one
+# keyframe plus a bounded number of events away. seq comes from a counter
+# shared by all workers.
+RANK_KEYFRAME_INTERVAL = 100
+
+def _rank_key(team_id: int, total_seconds: int):
+    # Same order as the leaderboard: timed teams by total, then untimed by id
+    return (0, total_seconds, team_id) if total_seconds > 0 else (1, 0, team_id)
+
+def _ranked(totals: dict) -> List[tuple]:
+    return sorted((_rank_key(tid, total), tid) for tid, total in totals.items())
+
+class RankHistory:
+    """This worker's view of the rank order, used to describe each move.
+
+    Before recording, events stored by other workers since the last one seen
+    here are applied, so from_rank/to_rank follow the shared order. A write
+    whose event another worker has not stored yet can still be missed; replay
+    doesn't depend on the stored ranks, it re-sorts the stored totals.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._totals = None   # team_id -> total seconds; None until loaded
+        self._order = []      # team_ids in rank order
+        self._keys = []       # _rank_key for each entry of _order
+        self._seq = 0         # last event applied to this view
+
+    def reset(self):
+        self._totals = None
+        self._order = []
+        self._keys = []
+        self._seq = 0
+
+    async def prepare(self):
+        """Load the current order if needed. save_time calls this before its
+        write so the load can't already include the new time."""
+        async with self._lock:
+            if self._totals is None:
+                await self._write_keyframe()
+
+    async def reload(self):
+        """Store a keyframe of the current teams, e.g. after teams are replaced."""
+        async with self._lock:
+            await self._write_keyframe()
+
+    async def _write_keyframe(self):
+        last = await db.rank_history.find_one({}, {"_id": 0, "seq": 1}, sort=[("seq", -1)])
+        if last:
+            # History written before the shared counter existed
+            await db.counters.update_one({"_id": "rank_history"}, {"$max": {"value": last["seq"]}}, upsert=True)
+        seq = await next_sequence("rank_history")
+        # Read after taking seq: the keyframe then includes every write whose
+        # event has a lower seq
+        teams = await db.teams.find({}, {"_id": 0, "team_id": 1, "times": 1, "station_times": 1}).to_list(10000)
+        self._set_state({t["team_id"]: station_config.total_seconds(team_times(t)) for t in teams}, seq)
+        await db.rank_history.insert_one({
+            "seq": seq,
+            "at": _now_iso(),
+            "order": self._order[:],
+            "totals": [key[1] for key in self._keys],
+        })
+
+    def _set_state(self, totals: dict, seq: int):
+        ranked = _ranked(totals)
+        self._totals = dict(totals)
+        self._keys = [key for key, _ in ranked]
+        self._order = [tid for _, tid in ranked]
+        self._seq = seq
+
+    def _move(self, team_id: int, total: int) -> tuple:
+        if team_id in self._totals:
+            from_pos = self._order.index(team_id)
+            del self._order[from_pos]
+            del self._keys[from_pos]
+        else:
+            from_pos = len(self._order)
+        key = _rank_key(team_id, total)
+        to_pos = bisect.bisect_left(self._keys, key)
+        self._order.insert(to_pos, team_id)
+        self._keys.insert(to_pos, key)
+        self._totals[team_id] = total
+        return from_pos, to_pos
+
+    async def _catch_up(self, until_seq: int):
+        events = db.rank_history.find({"seq": {"$gt": self._seq, "$lt": until_seq}}, {"_id": 0}).sort("seq", 1)
+        async for event in events:
+            if "team_id" in event:
+                self._move(event["team_id"], event["total_seconds"])
+            else:
+                self._set_state(dict(zip(event["order"], event["totals"])), event["seq"])
+            self._seq = event["seq"]
+
+    async def record(self, team_id: int, station_idx: int):
+        async with self._lock:
+            if self._totals is None:
+                await self._write_keyframe()
+            # Same rule as keyframes: take seq after the write, then read, so
+            # a team's highest-seq event always carries its latest total
+            seq = await next_sequence("rank_history")
+            team = await db.teams.find_one({"team_id": team_id}, {"_id": 0, "times": 1, "station_times": 1})
+            if team is None:
+                return
+            total = station_config.total_seconds(team_times(team))
+            await self._catch_up(seq)
+            from_pos, to_pos = self._move(team_id, total)
+            self._seq = seq
+            await db.rank_history.insert_one({
+                "seq": seq,
+                "at": _now_iso(),
+                "team_id": team_id,
+                "station": station_config.names[station_idx],
+                "from_rank": from_pos + 1,
+                "to_rank": to_pos + 1,
+                "total_seconds": total,
+            })
+            if seq % RANK_KEYFRAME_INTERVAL == 0:
+                await self._write_keyframe()
+
+rank_history = RankHistory()
+
+async def rank_state_at(seq: int) -> Optional[dict]:
+    """Rebuild the rank order and totals as they were right after event `seq`."""
+    keyframe = await public_db.rank_history.find_one(
+        {"seq": {"$lte": seq}, "order": {"$exists": True}}, {"_id": 0}, sort=[("seq", -1)]
+    )
+    if not keyframe:
+        return None
+    totals = dict(zip(keyframe["order"], keyframe["totals"]))
+    last = keyframe
+    events = public_db.rank_history.find(
+        {"seq": {"$gt": keyframe["seq"], "$lte": seq}, "team_id": {"$exists": True}},
+        {"_id": 0, "team_id": 1, "total_seconds": 1, "seq": 1, "at": 1}
+    ).sort("seq", 1)
+    async for event in events:
+        totals[event["team_id"]] = event["total_seconds"]
+        last = event
+    order = [tid for _, tid in _ranked(totals)]
+    return {"seq": last["seq"], "at": last["at"], "order": order, "totals": totals}
+
+def _history_time(value: str) -> str:
+    """Normalise an ISO timestamp to the UTC form history entries store `at`
+    in, so the two compare correctly as strings. Naive times are UTC."""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid timestamp: {value}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+async def resolve_history_seq(seq: Optional[int], at: Optional[str]) -> int:
+    if seq is not None:
+        return seq
+    query = {"at": {"$lte": _history_time(at)}} if at else {}
+    last = await public_db.rank_history.find_one(query, {"_id": 0, "seq": 1}, sort=[("seq", -1)])
+    if not last:
+        raise HTTPException(status_code=404, detail="No rank history at that point")
+    return last["seq"]
+
+@api_router.get("/leaderboard/history")
+async def get_rank_history(after_seq: int = 0, limit: int = 200):
+    limit = max(1, min(limit, 1000))
+    events = await public_db.rank_history.find(
+        {"seq": {"$gt": after_seq}, "team_id": {"$exists": True}},
+        {"_id": 0, "order": 0, "totals": 0}
+    ).sort("seq", 1).limit(limit).to_list(limit)
+    return {"events": events}
+
+@api_router.get("/leaderboard/replay")
+async def replay_leaderboard(seq: Optional[int] = None, at: Optional[str] = None):
+    state = await rank_state_at(await resolve_history_seq(seq, at))
+    if not state:
+        raise HTTPException(status_code=404, detail="No rank history at that point")
+    totals = state["totals"]
+    return {
+        "seq": state["seq"],
+        "at": state["at"],
+        "leaderboard": [
+            {
+                "rank": i + 1,
+                "team_id": tid,
+                "total_seconds": totals[tid],
+                "total_time_str": format_seconds(totals[tid]) if totals[tid] > 0 else "--:--",
+            }
+            for i, tid in enumerate(state["order"])
+        ]
+    }
+
+@api_router.get("/leaderboard/movers")
+async def get_biggest_movers(
+    since_seq: Optional[int] = None, since: Optional[str] = None,
+    until_seq: Optional[int] = None, until: Optional[str] = None,
+    limit: int = 10
+):
+    """Teams whose rank changed most between two points (default: whole event)."""
+    limit = max(1, min(limit, 100))
+    if since_seq is None and since is None:
+        first = await public_db.rank_history.find_one({}, {"_id": 0, "seq": 1}, sort=[("seq", 1)])
+        since_seq = first["seq"] if first else 0
+    start = await rank_state_at(await resolve_history_seq(since_seq, since))
+    end = await rank_state_at(await resolve_history_seq(until_seq, until))
+    if not start or not end:
+        raise HTTPException(status_code=404, detail="No rank history at that point")
+
+    start_rank = {tid: i + 1 for i, tid in enumerate(start["order"])}
+    movers = []
+    for i, tid in enumerate(end["order"]):
+        before = start_rank.get(tid)
+        if before is None or before == i + 1:
+            continue
+        movers.append({"team_id": tid, "from_rank": before, "to_rank": i + 1, "gained": before - (i + 1)})
+    movers.sort(key=lambda m: (-abs(m["gained"]), m["to_rank"]))
+    return {
+        "since_seq": start["seq"],
+        "until_seq": end["seq"],
+        "movers": movers[:limit]
+    }
+
+# --- Snapshot Publishing ---
+# When SNAPSHOT_DIR is set, public views are rendered to static JSON after
+# writes so spectators can be served by any static file server. Each publish
+# writes immutable `<name>.<version>.json` files plus a `<name>.json` alias and
+# `manifest.json`, all via write-to-temp + rename so readers never see a
+# partial file. Every worker publishes into the same directory, so versions
+# are allocated, and old ones pruned, under a lock file there.
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR')
+SNAPSHOT_DEBOUNCE_SECONDS = float(os.environ.get('SNAPSHOT_DEBOUNCE_SECONDS', '0.5'))
+SNAPSHOT_KEEP_VERSIONS = 5
+
+def build_station_views(leaderboard: List[dict]) -> List[dict]:
+    """Per-station rankings of every team that has a result at that station."""
+    config = station_config
+    views = []
+    for idx, station in enumerate(config.names):
+        sign = 1 if config.lower_is_better[idx] else -1
+        entries = [
+            (station_value(e["station_times"][station]), e["team_id"], e)
+            for e in leaderboard if station in e["station_times"]
+        ]
+        entries.sort(key=lambda x: (sign * x[0], x[1]))
+        views.append({
+            "station": station,
+            "unit": config.units[idx],
+            "results": [
+                {
+                    "rank": i + 1,
+                    "team_id": team_id,
+                    "members": e["members"],
+                    "wave_id": e["wave_id"],
+                    "value": value,
+                    "time_str": config.format(idx, value),
+                }
+                for i, (value, team_id, e) in enumerate(entries)
+            ]
+        })
+    return views
+
+def _write_json_atomic(path: Path, data: dict):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+class SnapshotPublisher:
+    def __init__(self, directory: Optional[str]):
+        self._dir = Path(directory) if directory else None
+        self._task = None
+        self._dirty = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._dir is not None
+
+    def schedule(self):
+        """Mark snapshots stale; writes within the debounce window share one publish."""
+        if not self.enabled:
+            return
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._dirty:
+            await asyncio.sleep(SNAPSHOT_DEBOUNCE_SECONDS)
+            self._dirty = False
+            try:
+                await self.publish()
+            except Exception:
+                logger.exception("Snapshot publish failed")
+
+    async def publish(self) -> int:
+        async with self._lock:
+            # Every write bumps the data version after landing, so whatever
+            # is read below is at least this fresh
+            await poll_data_versions()
+            data_version = data_versions["public"]
+            teams = await db.teams.find({}, {"_id": 0}).to_list(10000)
+            waves = await db.waves.find({}, {"_id": 0}).to_list(10000)
+            settings = await db.settings.find_one({"key": "active"}, {"_id": 0})
+            leaderboard = build_leaderboard(teams, waves, settings, data_version)
+            files = {
+                "leaderboard": leaderboard,
+                "waves": build_waves_view(waves, teams),
+                "stations": {"stations": station_config.names, "definitions": station_config.describe()},
+            }
+            for i, view in enumerate(build_station_views(leaderboard["leaderboard"])):
+                files[f"station-{i + 1}"] = view
+            return await asyncio.to_thread(self._write, files, data_version)
+
+    def _write(self, files: dict, data_version: int) -> int:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = self._dir / "manifest.json"
+        with open(self._dir / ".publish.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(manifest_path) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                manifest = {}
+            if manifest.get("data_version", 0) > data_version:
+                # Another worker already published newer data
+                return manifest["version"]
+            version = manifest.get("version", 0) + 1
+            published_at = _now_iso()
+
+            for name, data in files.items():
+                data = {**data, "version": version, "published_at": published_at}
+                _write_json_atomic(self._dir / f"{name}.{version}.json", data)
+                _write_json_atomic(self._dir / f"{name}.json", data)
+            _write_json_atomic(manifest_path, {
+                "version": version,
+                "data_version": data_version,
+                "published_at": published_at,
+                "files": {name: f"{name}.{version}.json" for name in files},
+            })
+
+            # Drop versions old enough that no client should still be reading them
+            for path in self._dir.glob("*.*.json"):
+                old = path.name.rsplit(".", 2)[1]
+                if old.isdigit() and int(old) <= version - SNAPSHOT_KEEP_VERSIONS:
+                    path.unlink(missing_ok=True)
+        return version
+
+snapshot_publisher = SnapshotPublisher(SNAPSHOT_DIR)
+
+@api_router.post("/snapshots/publish")
+async def publish_snapshots(_=Depends(verify_token)):
+    if not snapshot_publisher.enabled:
+        raise HTTPException(status_code=400, detail="Snapshot publishing is disabled (set SNAPSHOT_DIR)")
+    version = await snapshot_publisher.publish()
+    return {"version": version, "message": f"Published snapshot version {version}"}
+
+# --- Display Feed ---
+# The venue big screen shows one screen-sized page at a time: the top of the
+# leaderboard, the active wave, then each station's leaders. Pages are rendered
+# and encoded once per data version and rotate on a wall-clock schedule, so
+# every screen shows the same page and a poll costs one small cached response.
+DISPLAY_TICK_SECONDS = float(os.environ.get('DISPLAY_TICK_SECONDS', '8'))
+DISPLAY_TOP_N = int(os.environ.get('DISPLAY_TOP_N', '20'))
+DISPLAY_ROWS_PER_PAGE = int(os.environ.get('DISPLAY_ROWS_PER_PAGE', '10'))
+DISPLAY_STATION_LEADERS = 3
+
+def _display_row(entry: dict) -> dict:
+    return {
+        "rank": entry["rank"],
+        "team_id": entry["team_id"],
+        "members": entry["members"],
+        "current_station": entry["current_station"],
+        "total_time_str": entry["total_time_str"],
+        "projected_time_str": entry["projected_time_str"],
+        "is_active": entry["is_active"],
+    }
+
+def build_display_pages(board: dict) -> List[dict]:
+    """Split a build_leaderboard result into the big screen's rotation."""
+    leaderboard = board["leaderboard"]
+    context = {
+        "active_wave_id": board["active_wave_id"],
+        "active_station": board["active_station"],
+        "tick_seconds": DISPLAY_TICK_SECONDS,
+    }
+    
+    ranked = [e for e in leaderboard[:DISPLAY_TOP_N] if e["total_seconds"] > 0]
+    pages = []
+    for start in range(0, len(ranked), DISPLAY_ROWS_PER_PAGE):
+        rows = ranked[start:start + DISPLAY_ROWS_PER_PAGE]
+        pages.append({
+            "kind": "top",
+            "title": f"Top {rows[0]['rank']}-{rows[-1]['rank']}",
+            "rows": [_display_row(e) for e in rows],
+        })
+    if not pages:
+        # Keep something on screen before the first time comes in
+        pages.append({"kind": "top", "title": "Leaderboard", "rows": []})
+    
+    if board["active_wave_id"] is not None:
+        pages.append({
+            "kind": "wave",
+            "title": f"Wave {board['active_wave_id']}",
+            "rows": [_display_row(e) for e in leaderboard if e["is_active"]],
+        })
+    
+    leaders = [
+        {
+            "station": view["station"],
+            "unit": view["unit"],
+            "leaders": [
+                {"rank": r["rank"], "team_id": r["team_id"], "members": r["members"], "time_str": r["time_str"]}
+                for r in view["results"][:DISPLAY_STATION_LEADERS]
+            ],
+        }
+        for view in build_station_views(leaderboard)
+        if view["results"]
+    ]
+    if leaders:
+        pages.append({"kind": "stations", "title": "Station Leaders", "stations": leaders})
+    
+    return [{**page, **context, "page": i, "pages": len(pages)} for i, page in enumerate(pages)]
+
+class DisplayFeed:
+    """Encoded display pages, rebuilt on the first request after the shared
+    "public" data version moves.
+
+    Pages are read from `db` so a rebuild never picks up a lagging secondary
+    and keeps the old rows under the new version.
+    """
+
+    def __init__(self):
+        self._built_version = None
+        self._pages = []      # (body bytes, etag) per page
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._built_version = None
+
+    async def pages(self) -> List[tuple]:
+        if self._built_version != data_versions["public"]:
+            async with self._lock:
+                if self._built_version != data_versions["public"]:
+                    # A write landing mid-build moves the version again, so
+                    # the next request rebuilds instead of keeping stale pages
+                    version = data_versions["public"]
+                    teams = await db.teams.find({}, {"_id": 0}).to_list(10000)
+                    waves = await db.waves.find({}, {"_id": 0}).to_list(10000)
+                    settings = await db.settings.find_one({"key": "active"}, {"_id": 0})
+                    pages = build_display_pages(build_leaderboard(teams, waves, settings, version))
+                    self._pages = [self._encode(page) for page in pages]
+                    self._built_version = version
+        return self._pages
+
+    @staticmethod
+    def _encode(page: dict) -> tuple:
+        body = json.dumps(page, separators=(",", ":")).encode()
+        return body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+display_feed = DisplayFeed()
+
+async def public_data_changed(members: bool = False):
+    """Await after any write that changes what spectators see; pass
+    members=True if it also changed participants, team members or waves
+    (after applying it to member_index)."""
+    try:
+        await bump_data_version("public")
+        if members:
+            version = await bump_data_version("members")
+            if member_index.version == version - 1:
+                # Nothing else changed since the index was current
+                member_index.version = version
+    except Exception:
+        # The write itself went through; other workers catch up on the next bump
+        logger.exception("Failed to bump the data versions")
+        display_feed.invalidate()
+    snapshot_publisher.schedule()
+
+@api_router.get("/display")
+async def get_display_page(page: Optional[int] = None, if_none_match: Optional[str] = Header(None)):
+    pages = await display_feed.pages()
+    now = time.time()
+    if page is None:
+        page = int(now // DISPLAY_TICK_SECONDS) % len(pages)
+    elif not 0 <= page < len(pages):
+        raise HTTPException(status_code=404, detail=f"Display page {page} not found ({len(pages)} pages)")
+    
+    body, etag = pages[page]
+    # Cacheable until the rotation moves on to the next page
+    remaining = DISPLAY_TICK_SECONDS - now % DISPLAY_TICK_SECONDS
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={int(remaining)}"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # --- Reset ---
-@api_router.post("/reset")
+@api_router.post("/reset", status_code=202)
 async def reset_data(_=Depends(verify_token)):
-    await db.participants.delete_many({})
-    await db.teams.delete_many({})
-    await db.waves.delete_many({})
-    await db.settings.delete_many({})
-    return {"message": "All data reset"}
+    async def work(progress: JobProgress):
+        await clear_event_data(progress, ["participants", "teams", "waves", "settings", "rank_history"])
+        member_index.clear()
+        projection_cache.invalidate()
+        await rank_history.reload()
+        await public_data_changed(members=True)
+        return {"message": "All data reset"}
+    
+    job = await job_runner.submit("reset", work)
+    return job_response(job, "Resetting all data")
+
+# --- Startup & Readiness ---
+# Workers start serving as soon as the app is imported. Connections, indexes
+# and caches are warmed in the background and /api/ready reports when that has
+# finished, so a load balancer can hold traffic until then.
+WARM_UP_RETRY_SECONDS = 2.0
+readiness = {
+    "mongo": False, "station_config": False, "indexes": False,
+    "member_index": False, "projections": False, "rank_history": False,
+}
+started_at = time.monotonic()
+
+async def _warm_connections():
+    # Open pooled connections up front so the first requests don't pay for
+    # TCP/TLS handshakes and server selection
+    await asyncio.gather(
+        *[db.command("ping") for _ in range(MONGO_MIN_POOL_SIZE)],
+        *[public_db.command("ping", read_preference=public_db.read_preference)
+          for _ in range(MONGO_PUBLIC_MIN_POOL_SIZE)],
+    )
+
+async def _ensure_indexes():
+    await db.rank_history.create_index("seq", unique=True)
+    await db.teams.create_index("team_id")
+    await db.jobs.create_index("job_id", unique=True)
+
+async def _warm_projections():
+    teams = await db.teams.find({}, {"_id": 0}).to_list(10000)
+    projection_cache.projections(teams)
+
+WARM_UP_STEPS = [
+    ("mongo", _warm_connections),
+    ("station_config", load_station_config),
+    ("indexes", _ensure_indexes),
+    ("member_index", rebuild_member_index),
+    ("projections", _warm_projections),
+    ("rank_history", rank_history.prepare),
+]
+
+async def warm_up():
+    while not all(readiness.values()):
+        for name, step in WARM_UP_STEPS:
+            if readiness[name]:
+                continue
+            try:
+                await step()
+                readiness[name] = True
+            except Exception as e:
+                logger.warning(f"Warm-up step {name} failed, will retry: {e}")
+                break
+        else:
+            break
+        await asyncio.sleep(WARM_UP_RETRY_SECONDS)
+    logger.info(f"Warm-up complete in {time.monotonic() - started_at:.2f}s")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = [
+        asyncio.create_task(warm_up()),
+        asyncio.create_task(watch_station_config()),
+        asyncio.create_task(watch_data_versions()),
+        asyncio.create_task(watch_stale_jobs()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    for client in mongo_clients:
+        client.close()
+
+@api_router.get("/health")
+async def health():
+    return {"status": "ok"}
+
+@api_router.get("/ready")
+async def ready():
+    body = {"ready": all(readiness.values()), "checks": readiness, "uptime_seconds": round(time.monotonic() - started_at, 3)}
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+app = FastAPI(lifespan=lifespan)
 
 # Include router
 app.include_router(api_router)
@@ -406,7 +2410,3 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
@@ -2,6 +2,7 @@ import requests
 import sys
 import json
 import tempfile
+import time
 from datetime import datetime
 
 class TrioTAGAPITester:
@@ -66,6 +67,22 @@ class TrioTAGAPITester:
         except Exception as e:
             return self.log_test(name, False, f"Request failed: {str(e)}"), {}
 
+    def wait_for_job(self, name, response, timeout=30):
+        """Poll a background job until it finishes"""
+        job_id = response.get('job_id')
+        if not job_id:
+            return self.log_test(name, False, f"No job_id in response: {response}"), {}
+        headers = {'Authorization': f'Bearer {self.token}'}
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = requests.get(f"{self.api}/jobs/{job_id}", headers=headers, timeout=10).json()
+            if job.get('status') == 'succeeded':
+                return self.log_test(name, True), job.get('result') or {}
+            if job.get('status') == 'failed':
+                return self.log_test(name, False, job.get('error')), {}
+            time.sleep(0.5)
+        return self.log_test(name, False, "Timed out waiting for job"), {}
+
     def test_login_valid(self):
         """Test login with valid credentials"""
         success, response = self.run_api_test(
@@ -133,11 +150,13 @@ class TrioTAGAPITester:
                 "CSV upload of participants",
                 "POST",
                 "participants/upload",
-                200,
+                202,
                 files=files,
                 need_auth=True
             )
         
+        if success:
+            success, _ = self.wait_for_job("CSV upload job", response)
         if success:
             if response.get('total') == 6 and response.get('males') == 3 and response.get('females') == 3:
                 return self.log_test("CSV upload data validation", True)
@@ -163,10 +182,12 @@ class TrioTAGAPITester:
             "Generate teams (2M/1F mode)",
             "POST", 
             "teams/generate",
-            200,
+            202,
             data={"mode": "2m1f"},
             need_auth=True
         )
+        if success:
+            success, _ = self.wait_for_job("Generate teams (2M/1F) job", response)
         return success
 
     def test_team_generation_random(self):
@@ -175,10 +196,12 @@ class TrioTAGAPITester:
             "Generate teams (random mode)",
             "POST",
             "teams/generate", 
-            200,
+            202,
             data={"mode": "random"},
             need_auth=True
         )
+        if success:
+            success, _ = self.wait_for_job("Generate teams (random) job", response)
         return success
 
     def test_get_teams(self):
@@ -261,7 +284,7 @@ class TrioTAGAPITester:
             if len(leaderboard) > 0:
                 # Check if leaderboard has proper structure
                 entry = leaderboard[0]
-                required_fields = ['team_id', 'members', 'current_station', 'total_time_str', 'rank']
+                required_fields = ['team_id', 'members', 'current_station', 'total_time_str', 'rank', 'projected_seconds', 'projected_rank']
                 if all(field in entry for field in required_fields):
                     return self.log_test("Leaderboard structure validation", True)
                 else:
@@ -270,15 +293,41 @@ class TrioTAGAPITester:
                 return self.log_test("Leaderboard has data", True)  # Empty is also valid
         return success
 
+    def test_display_feed(self):
+        """Test the big-screen display feed serves one page at a time"""
+        success, response = self.run_api_test(
+            "Get display page (public access)",
+            "GET",
+            "display?page=0",
+            200
+        )
+        if not success:
+            return success
+        required_fields = ['kind', 'title', 'page', 'pages', 'tick_seconds']
+        if not all(field in response for field in required_fields):
+            return self.log_test("Display page structure validation", False, f"Got keys {list(response)}")
+        rows = response.get('rows', [])
+        if len(rows) > 10:
+            return self.log_test("Display page size validation", False, f"Page has {len(rows)} rows")
+        success2, _ = self.run_api_test(
+            "Display page out of range",
+            "GET",
+            f"display?page={response['pages']}",
+            404
+        )
+        return success2
+
     def test_reset_data(self):
         """Test data reset functionality"""
-        success, _ = self.run_api_test(
+        success, response = self.run_api_test(
             "Reset all data", 
             "POST",
             "reset",
-            200,
+            202,
             need_auth=True
         )
+        if success:
+            success, _ = self.wait_for_job("Reset job", response)
         return success
 
     def test_token_validation(self):
@@ -364,6 +413,64 @@ class TrioTAGAPITester:
             return success2
         return success
 
+    def test_member_search(self):
+        """Test member name search finds the edited team, with and without typos"""
+        success, response = self.run_api_test(
+            "Search members by prefix",
+            "GET",
+            "search?q=Edited%20Memb",
+            200
+        )
+        if not success:
+            return success
+        results = response.get('results', [])
+        if not results or results[0].get('team_id') is None:
+            return self.log_test("Search prefix validation", False, f"Unexpected results: {results[:3]}")
+
+        success2, response2 = self.run_api_test(
+            "Search members with a typo",
+            "GET",
+            "search?q=Edtied",
+            200
+        )
+        if success2:
+            names = [r['name'] for r in response2.get('results', [])]
+            return self.log_test("Search typo validation", "Edited Member 1" in names, f"Got {names[:5]}")
+        return success2
+
+    def test_check_in(self):
+        """Test marking a no-show absent repairs their team, and marking them present seats them again"""
+        success, summary = self.run_api_test("Get participants for check-in", "GET", "participants/summary", 200)
+        if not success or not summary.get('participants'):
+            return success
+        name = summary['participants'][-1]['name']
+
+        success, response = self.run_api_test(
+            "Mark participant absent",
+            "POST",
+            "participants/checkin",
+            200,
+            data={"absent": [name, "Nobody Registered"]},
+            need_auth=True
+        )
+        if not success:
+            return success
+        removed = [m['name'] for m in response.get('repair', {}).get('removed_members', [])]
+        if name not in removed or response.get('not_found') != ["Nobody Registered"]:
+            return self.log_test("Check-in absent validation", False, f"Got {response}")
+
+        success, response = self.run_api_test(
+            "Mark participant present again",
+            "POST",
+            "participants/checkin",
+            200,
+            data={"present": [name]},
+            need_auth=True
+        )
+        if success:
+            return self.log_test("Check-in present validation", response.get('repair', {}).get('placed') == 1, f"Got {response.get('repair')}")
+        return success
+
     def test_edit_team_invalid_data(self):
         """Test team editing with invalid data"""
         # Test with invalid gender
@@ -439,8 +546,10 @@ def main():
     
     print("\n✏️ Team Editing")
     tester.test_edit_team()
+    tester.test_member_search()
     tester.test_edit_team_invalid_data()
     tester.test_edit_nonexistent_team()
+    tester.test_check_in()
     
     print("\n⏱️ Time Management")
     tester.test_save_time()
@@ -448,6 +557,7 @@ def main():
     
     print("\n📋 Leaderboard")
     tester.test_leaderboard()
+    tester.test_display_feed()
     
     print("\n🔄 Data Management")
     tester.test_reset_data()
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import random
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+# Mixed-load latency check: spectator threads poll the public read endpoints
+# while judge threads save times, then per-endpoint latency percentiles are
+# printed. Run it once with MONGO_PUBLIC_READ_PREFERENCE=primary and once with
+# secondaryPreferred (see docker-compose.replset.yml) to compare. A probe
+# thread also reports how long a saved time takes to show up on
+# /leaderboard, which is the staleness spectators see.
+#
+#   python bench_mixed_load.py [base_url] [seconds]
+#
+# The target event needs teams generated already; times are written to them.
+BASE_URL = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("BENCH_BASE_URL", "http://localhost:8001")
+DURATION = float(sys.argv[2]) if len(sys.argv) > 2 else 30.0
+READERS = int(os.environ.get("BENCH_READERS", "32"))
+WRITERS = int(os.environ.get("BENCH_WRITERS", "4"))
+API = f"{BASE_URL}/api"
+
+PUBLIC_ENDPOINTS = ["leaderboard", "waves", "teams"]
+
+latencies = {}
+lock = threading.Lock()
+
+def record(name, seconds):
+    with lock:
+        latencies.setdefault(name, []).append(seconds)
+
+def reader(deadline):
+    session = requests.Session()
+    while time.time() < deadline:
+        endpoint = random.choice(PUBLIC_ENDPOINTS)
+        start = time.perf_counter()
+        session.get(f"{API}/{endpoint}", timeout=30)
+        record(f"GET /{endpoint}", time.perf_counter() - start)
+
+def writer(deadline, token, team_ids, stations):
+    session = requests.Session()
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.time() < deadline:
+        body = {
+            "team_id": random.choice(team_ids),
+            "station": random.choice(stations),
+            "time_str": f"{random.randint(2, 9):02d}:{random.randint(0, 59):02d}",
+        }
+        start = time.perf_counter()
+        session.post(f"{API}/times/save", json=body, headers=headers, timeout=30)
+        record("POST /times/save", time.perf_counter() - start)
+        time.sleep(0.05)
+
+def probe(deadline, token, team_id, station):
+    """Save a time about once a second and poll /leaderboard until it shows."""
+    session = requests.Session()
+    headers = {"Authorization": f"Bearer {token}"}
+    seconds = None
+    while time.time() < deadline:
+        # 10-59 minutes, so never a value the writers (2-9 minutes) produce
+        seconds = random.choice([s for s in range(600, 3600, 7) if s != seconds])
+        body = {"team_id": team_id, "station": station, "time_str": f"{seconds // 60:02d}:{seconds % 60:02d}"}
+        session.post(f"{API}/times/save", json=body, headers=headers, timeout=30)
+        saved = time.perf_counter()
+        while time.time() < deadline:
+            board = session.get(f"{API}/leaderboard", timeout=30).json()["leaderboard"]
+            entry = next(e for e in board if e["team_id"] == team_id)
+            if entry["station_times"].get(station, {}).get("total_seconds") == seconds:
+                record("visible after save", time.perf_counter() - saved)
+                break
+            time.sleep(0.01)
+        time.sleep(1)
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def main():
+    token = requests.post(f"{API}/auth/login", json={"username": "365run", "password": "GANG365"}).json()["token"]
+    team_ids = [t["team_id"] for t in requests.get(f"{API}/teams").json()["teams"]]
+    stations = requests.get(f"{API}/stations").json()["stations"]
+    if len(team_ids) < 2:
+        print("Need at least two teams; upload participants and generate teams first")
+        return 1
+    # The probe owns the first team so writers never overwrite its time
+    probe_team, team_ids = team_ids[0], team_ids[1:]
+
+    print(f"{BASE_URL}: {READERS} readers, {WRITERS} writers, {len(team_ids)} teams, {DURATION:.0f}s")
+    deadline = time.time() + DURATION
+    with ThreadPoolExecutor(max_workers=READERS + WRITERS + 1) as pool:
+        for _ in range(READERS):
+            pool.submit(reader, deadline)
+        for _ in range(WRITERS):
+            pool.submit(writer, deadline, token, team_ids, stations)
+        pool.submit(probe, deadline, token, probe_team, stations[0])
+
+    print(f"{'endpoint':<20} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, values in sorted(latencies.items()):
+        print(f"{name:<20} {len(values):>7} {percentile(values, 50) * 1000:>8.1f} "
+              f"{percentile(values, 95) * 1000:>8.1f} {percentile(values, 99) * 1000:>8.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
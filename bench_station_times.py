@@ -0,0 +1,66 @@
+import os
+import sys
+import random
+import time
+import bson
+
+# Compare the map and compact array station_times schemas: BSON document size
+# and in-process leaderboard build time. No database needed.
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "triotag_bench")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "backend"))
+import server  # noqa: E402
+
+TEAM_COUNTS = [500, 2000, 5000]
+REPEATS = 5
+
+def make_teams(n, compact):
+    teams = []
+    for team_id in range(1, n + 1):
+        done = random.randint(0, len(server.station_config.names))
+        seconds = [random.randint(90, 420) if i < done else None for i in range(len(server.station_config.names))]
+        team = {
+            "team_id": team_id,
+            "members": [{"name": f"Runner {team_id}-{i}", "gender": "MMF"[i]} for i in range(3)],
+        }
+        if compact:
+            team["times"] = seconds
+        else:
+            team["station_times"] = server.station_times_map(seconds)
+        teams.append(team)
+    return teams
+
+def bench(n, compact):
+    random.seed(n)
+    teams = make_teams(n, compact)
+    waves = [{"wave_id": i // 3 + 1, "team_ids": [t["team_id"] for t in teams[i:i + 3]]} for i in range(0, n, 3)]
+    size = sum(len(bson.encode(t)) for t in teams) / n
+
+    def best_ms(**kwargs):
+        best = float("inf")
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            server.build_leaderboard(teams, waves, None, **kwargs)
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
+
+    server.projection_cache.invalidate()
+    server.build_leaderboard(teams, waves, None, data_version=1)
+    # Cached projections, checked by data version (read from the primary) and
+    # by comparing times (read from a secondary)
+    by_version = best_ms(data_version=1)
+    by_times = best_ms()
+    server.projection_cache.invalidate()
+    cold = float("inf")
+    for _ in range(REPEATS):
+        server.projection_cache.invalidate()
+        start = time.perf_counter()
+        server.build_leaderboard(teams, waves, None)
+        cold = min(cold, time.perf_counter() - start)
+    return size, cold * 1000, by_version, by_times
+
+print(f"{'teams':>6} {'schema':>6} {'bytes/doc':>10} {'build ms':>9} {'cached ms':>10} {'compared ms':>12}")
+for n in TEAM_COUNTS:
+    for compact in (False, True):
+        size, cold, by_version, by_times = bench(n, compact)
+        print(f"{n:>6} {'array' if compact else 'map':>6} {size:>10.0f} {cold:>9.2f} {by_version:>10.2f} {by_times:>12.2f}")
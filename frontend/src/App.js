@@ -4,6 +4,7 @@ import { BrowserRouter, Routes, Route, Navigate } from "react-router-dom";
 import LoginPage from "@/pages/LoginPage";
 import AdminPanel from "@/pages/AdminPanel";
 import Leaderboard from "@/pages/Leaderboard";
+import Display from "@/pages/Display";
 import { Toaster } from "sonner";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
@@ -46,6 +47,10 @@ function App() {
             path="/leaderboard"
             element={<Leaderboard api={API} />}
           />
+          <Route
+            path="/display"
+            element={<Display api={API} />}
+          />
         </Routes>
       </BrowserRouter>
       <Toaster
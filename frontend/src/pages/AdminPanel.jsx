@@ -21,18 +21,10 @@ import {
   LogOut, Trophy, ChevronRight, Activity, Dumbbell, Pencil, Plus, Trash2, X
 } from "lucide-react";
 
-const STATIONS = [
-  "Row 750m",
-  "Farmers carry 24kg/16kg - 60m",
-  "Ski 750m",
-  "Broad burpee jumps 40m",
-  "Assault bike - 90cal",
-  "Body weight lunges 40m"
-];
-
 export default function AdminPanel({ api, token, onLogout }) {
   const [summary, setSummary] = useState(null);
   const [waves, setWaves] = useState([]);
+  const [stations, setStations] = useState([]);
   const [selectedStation, setSelectedStation] = useState("");
   const [selectedWave, setSelectedWave] = useState("");
   const [timeInputs, setTimeInputs] = useState({});
@@ -41,27 +33,51 @@ export default function AdminPanel({ api, token, onLogout }) {
   const fileInputRef = useRef(null);
   const [editingTeam, setEditingTeam] = useState(null);
   const [editMembers, setEditMembers] = useState([]);
+  const [checkInNames, setCheckInNames] = useState("");
 
   const headers = { Authorization: `Bearer ${token}` };
 
+  // Sending the token makes the server read from the primary, so these
+  // re-fetches always include the admin's own writes
   const fetchSummary = useCallback(async () => {
     try {
-      const res = await axios.get(`${api}/participants/summary`);
+      const res = await axios.get(`${api}/participants/summary`, { headers: { Authorization: `Bearer ${token}` } });
       setSummary(res.data);
     } catch { /* empty state is fine */ }
-  }, [api]);
+  }, [api, token]);
 
   const fetchWaves = useCallback(async () => {
     try {
-      const res = await axios.get(`${api}/waves`);
+      const res = await axios.get(`${api}/waves`, { headers: { Authorization: `Bearer ${token}` } });
       setWaves(res.data.waves || []);
     } catch { /* empty */ }
+  }, [api, token]);
+
+  const fetchStations = useCallback(async () => {
+    try {
+      const res = await axios.get(`${api}/stations`);
+      setStations(res.data.definitions || []);
+    } catch { /* empty */ }
   }, [api]);
 
   useEffect(() => {
     fetchSummary();
     fetchWaves();
-  }, [fetchSummary, fetchWaves]);
+    fetchStations();
+  }, [fetchSummary, fetchWaves, fetchStations]);
+
+  const stationDef = stations.find(s => s.name === selectedStation);
+  const isTimedStation = !stationDef || stationDef.unit === "time";
+
+  // Heavy admin operations run as background jobs; poll until they settle
+  const waitForJob = async (jobId) => {
+    for (;;) {
+      const res = await axios.get(`${api}/jobs/${jobId}`, { headers });
+      if (res.data.status === "succeeded") return res.data.result;
+      if (res.data.status === "failed") throw new Error(res.data.error || "Job failed");
+      await new Promise(resolve => setTimeout(resolve, 500));
+    }
+  };
 
   // Load existing times when wave/station changes
   useEffect(() => {
@@ -90,11 +106,12 @@ export default function AdminPanel({ api, token, onLogout }) {
       const res = await axios.post(`${api}/participants/upload`, formData, {
         headers: { ...headers, "Content-Type": "multipart/form-data" }
       });
-      toast.success(res.data.message);
+      const result = await waitForJob(res.data.job_id);
+      toast.success(result.message);
       fetchSummary();
       setWaves([]);
     } catch (err) {
-      toast.error(err.response?.data?.detail || "Upload failed");
+      toast.error(err.response?.data?.detail || err.message || "Upload failed");
     } finally {
       setLoading(prev => ({ ...prev, upload: false }));
       if (fileInputRef.current) fileInputRef.current.value = "";
@@ -105,16 +122,44 @@ export default function AdminPanel({ api, token, onLogout }) {
     setLoading(prev => ({ ...prev, generate: true }));
     try {
       const res = await axios.post(`${api}/teams/generate`, { mode }, { headers });
-      toast.success(res.data.message);
+      const result = await waitForJob(res.data.job_id);
+      toast.success(result.message);
       fetchWaves();
     } catch (err) {
-      toast.error(err.response?.data?.detail || "Generation failed");
+      toast.error(err.response?.data?.detail || err.message || "Generation failed");
     } finally {
       setLoading(prev => ({ ...prev, generate: false }));
     }
   };
 
+  // Mark names present/absent; the backend closes the gaps in affected teams only
+  const checkIn = async (status) => {
+    const names = checkInNames.split(/[,\n]/).map(n => n.trim()).filter(Boolean);
+    if (names.length === 0) return;
+    setLoading(prev => ({ ...prev, checkin: true }));
+    try {
+      const res = await axios.post(`${api}/participants/checkin`, { [status]: names }, { headers });
+      const repair = res.data.repair;
+      const notFound = res.data.not_found.length ? ` · not found: ${res.data.not_found.join(", ")}` : "";
+      toast.success(
+        `${names.length} marked ${status} · ${repair.updated_team_ids.length} teams updated, ` +
+        `${repair.dissolved_team_ids.length} merged, ${repair.moved} members moved${notFound}`
+      );
+      setCheckInNames("");
+      fetchSummary();
+      fetchWaves();
+    } catch (err) {
+      toast.error(err.response?.data?.detail || "Check-in failed");
+    } finally {
+      setLoading(prev => ({ ...prev, checkin: false }));
+    }
+  };
+
   const handleTimeChange = (teamId, value) => {
+    if (!isTimedStation) {
+      setTimeInputs(prev => ({ ...prev, [teamId]: value }));
+      return;
+    }
     // Allow only digits and colon, auto-format
     let clean = value.replace(/[^\d:]/g, "");
     // Auto-insert colon after 2 digits
@@ -127,10 +172,14 @@ export default function AdminPanel({ api, token, onLogout }) {
 
   const saveTime = async (teamId) => {
     const timeStr = timeInputs[teamId];
-    if (!timeStr || !timeStr.match(/^\d{1,2}:\d{2}$/)) {
+    if (isTimedStation && (!timeStr || !timeStr.match(/^\d{1,2}:\d{2}$/))) {
       toast.error("Enter time in MM:SS format");
       return;
     }
+    if (!timeStr) {
+      toast.error(`Enter ${stationDef.hint.toLowerCase()}`);
+      return;
+    }
     setLoading(prev => ({ ...prev, [`save_${teamId}`]: true }));
     try {
       const res = await axios.post(`${api}/times/save`, {
@@ -155,7 +204,8 @@ export default function AdminPanel({ api, token, onLogout }) {
   const resetAll = async () => {
     if (!window.confirm("Reset ALL data? This cannot be undone.")) return;
     try {
-      await axios.post(`${api}/reset`, {}, { headers });
+      const res = await axios.post(`${api}/reset`, {}, { headers });
+      await waitForJob(res.data.job_id);
       toast.success("All data cleared");
       setSummary(null);
       setWaves([]);
@@ -418,6 +468,33 @@ export default function AdminPanel({ api, token, onLogout }) {
                     {waves.length} Waves &middot; {waves.reduce((acc, w) => acc + (w.teams?.length || 0), 0)} Teams
                   </span>
                 </div>
+                <Card className="bg-[#121212] border-[#27272A] rounded-sm" data-testid="checkin-card">
+                  <CardContent className="p-4 flex flex-col sm:flex-row gap-2">
+                    <Input
+                      data-testid="checkin-names-input"
+                      value={checkInNames}
+                      onChange={(e) => setCheckInNames(e.target.value)}
+                      placeholder="Check-in: names, comma separated"
+                      className="bg-[#1A1A1A] border-[#27272A] text-white rounded-sm"
+                    />
+                    <Button
+                      data-testid="checkin-absent-button"
+                      onClick={() => checkIn("absent")}
+                      disabled={loading.checkin}
+                      className="h-10 bg-transparent border border-[#FF3B30]/50 text-[#FF3B30] font-bold uppercase tracking-wider rounded-sm hover:bg-[#FF3B30]/10"
+                    >
+                      Mark Absent
+                    </Button>
+                    <Button
+                      data-testid="checkin-present-button"
+                      onClick={() => checkIn("present")}
+                      disabled={loading.checkin}
+                      className="h-10 bg-transparent border border-[#34C759]/50 text-[#34C759] font-bold uppercase tracking-wider rounded-sm hover:bg-[#34C759]/10"
+                    >
+                      Mark Present
+                    </Button>
+                  </CardContent>
+                </Card>
                 {waves.map(wave => (
                   <Card key={wave.wave_id} className="bg-[#121212] border-[#27272A] rounded-sm" data-testid={`wave-card-${wave.wave_id}`}>
                     <CardHeader className="py-3 px-4">
@@ -504,7 +581,7 @@ export default function AdminPanel({ api, token, onLogout }) {
                         <SelectValue placeholder="Select Station" />
                       </SelectTrigger>
                       <SelectContent className="bg-[#121212] border-[#27272A]" data-testid="station-select-content">
-                        {STATIONS.map(s => (
+                        {stations.map(({ name: s }) => (
                           <SelectItem
                             key={s}
                             value={s}
@@ -594,12 +671,12 @@ export default function AdminPanel({ api, token, onLogout }) {
                                 <Input
                                   data-testid={`time-input-${team.team_id}`}
                                   type="text"
-                                  inputMode="numeric"
-                                  placeholder="MM:SS"
+                                  inputMode={isTimedStation ? "numeric" : "decimal"}
+                                  placeholder={stationDef?.hint || "MM:SS"}
                                   value={timeInputs[team.team_id] || ""}
                                   onChange={(e) => handleTimeChange(team.team_id, e.target.value)}
                                   className="time-input h-12 bg-[#1A1A1A] border-[#27272A] text-white rounded-sm focus:border-[#CCFF00] focus:ring-[#CCFF00] w-32"
-                                  maxLength={5}
+                                  maxLength={isTimedStation ? 5 : 10}
                                 />
                               </TableCell>
                               <TableCell>
@@ -0,0 +1,114 @@
+import { useState, useEffect } from "react";
+import axios from "axios";
+import { Badge } from "@/components/ui/badge";
+import { Trophy, Zap, Activity } from "lucide-react";
+
+// Venue big screen: fetches one precomputed page per rotation tick from
+// /api/display instead of re-rendering the whole leaderboard.
+const DEFAULT_TICK_SECONDS = 8;
+
+function Members({ members }) {
+  return (
+    <span className="text-[#A3A9B2] text-2xl">
+      {members.map((m) => m.name).join(" · ")}
+    </span>
+  );
+}
+
+function RankRows({ rows }) {
+  if (rows.length === 0) {
+    return (
+      <div className="flex flex-col items-center justify-center h-96 text-[#525252]" data-testid="display-empty">
+        <Activity className="h-20 w-20 mb-4" />
+        <p className="text-3xl font-heading font-bold uppercase tracking-wider">Waiting for data</p>
+      </div>
+    );
+  }
+  return (
+    <div className="flex flex-col gap-3">
+      {rows.map((row) => (
+        <div
+          key={row.team_id}
+          className={`flex items-center gap-8 border border-[#27272A] rounded-sm px-8 py-4 ${row.is_active ? "active-row" : "bg-[#121212]"}`}
+          data-testid={`display-row-${row.team_id}`}
+        >
+          <span className={`lb-rank text-5xl w-20 ${row.rank === 1 ? "text-[#CCFF00]" : "text-white"}`}>{row.rank}</span>
+          <span className="font-heading font-bold text-4xl text-white w-28">#{row.team_id}</span>
+          <div className="flex-1"><Members members={row.members} /></div>
+          <Badge className="rounded-sm font-heading font-bold text-sm uppercase tracking-wider bg-[#00E0FF]/15 text-[#00E0FF] border-[#00E0FF]/30">
+            {row.current_station}
+          </Badge>
+          <span className="lb-time text-4xl text-white w-40 text-right">{row.total_time_str}</span>
+        </div>
+      ))}
+    </div>
+  );
+}
+
+function StationLeaders({ stations }) {
+  return (
+    <div className="grid grid-cols-2 xl:grid-cols-3 gap-6">
+      {stations.map((s) => (
+        <div key={s.station} className="border border-[#27272A] bg-[#121212] rounded-sm p-6" data-testid={`display-station-${s.station}`}>
+          <h2 className="font-heading font-extrabold text-3xl text-[#CCFF00] uppercase mb-4">{s.station}</h2>
+          {s.leaders.map((l) => (
+            <div key={l.team_id} className="flex items-center gap-4 py-2">
+              <span className="lb-rank text-3xl text-white w-10">{l.rank}</span>
+              <span className="font-heading font-bold text-2xl text-white">#{l.team_id}</span>
+              <span className="lb-time text-2xl text-white ml-auto">{l.time_str}</span>
+            </div>
+          ))}
+        </div>
+      ))}
+    </div>
+  );
+}
+
+export default function Display({ api }) {
+  const [page, setPage] = useState(null);
+
+  useEffect(() => {
+    let timer;
+    const fetchPage = async () => {
+      let tick = DEFAULT_TICK_SECONDS;
+      try {
+        // The browser revalidates with the page's ETag on its own
+        const res = await axios.get(`${api}/display`);
+        setPage(res.data);
+        tick = res.data.tick_seconds;
+      } catch (err) {
+        console.error("Failed to fetch display page", err);
+      }
+      // Line up with the server's rotation so every screen flips together
+      const ms = tick * 1000;
+      timer = setTimeout(fetchPage, ms - (Date.now() % ms) + 50);
+    };
+    fetchPage();
+    return () => clearTimeout(timer);
+  }, [api]);
+
+  return (
+    <div className="min-h-screen px-12 py-10" data-testid="display-page">
+      <div className="flex items-center justify-between mb-8">
+        <h1 className="font-heading font-extrabold text-6xl tracking-tight text-white flex items-center gap-4" data-testid="display-title">
+          {page?.kind === "top" && <Trophy className="h-12 w-12 text-[#CCFF00]" />}
+          {page?.title || "LIVE LEADERBOARD"}
+        </h1>
+        <div className="flex items-center gap-3">
+          {page?.active_station && (
+            <Badge className="bg-[#CCFF00]/15 text-[#CCFF00] border-[#CCFF00]/30 font-heading font-bold rounded-sm text-lg uppercase">
+              <Zap className="h-4 w-4 mr-1" />
+              {page.active_station}
+            </Badge>
+          )}
+          {page && (
+            <span className="text-[#525252] text-lg" data-testid="display-page-count">
+              {page.page + 1} / {page.pages}
+            </span>
+          )}
+        </div>
+      </div>
+      {page?.kind === "stations" ? <StationLeaders stations={page.stations} /> : <RankRows rows={page?.rows || []} />}
+    </div>
+  );
+}
@@ -0,0 +1,62 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+def _wait_for_job(client, response, timeout=10):
+    """Poll a 202 job response until it settles and return the job."""
+    assert response.status_code == 202, response.text
+    job_id = response.json()["job_id"]
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+@pytest.fixture
+def wait_for_job():
+    return _wait_for_job
+
+@pytest.fixture
+def server(monkeypatch):
+    """The backend module wired to a fresh in-memory Mongo, with caches reset."""
+    pytest.importorskip("fastapi")
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import server
+
+    db = mongomock_motor.AsyncMongoMockClient()["triotag_test"]
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "public_db", db)
+    monkeypatch.setattr(db, "read_preference", None, raising=False)
+    monkeypatch.setattr(server, "station_config", server.StationConfig(server.DEFAULT_STATIONS))
+    monkeypatch.setattr(server, "data_versions", {kind: 0 for kind in server.data_versions})
+    monkeypatch.setattr(server, "member_index", server.MemberSearchIndex())
+    server.display_feed.invalidate()
+    server.projection_cache.invalidate()
+    server.rank_history.reset()
+    return server
+
+@pytest.fixture
+def client(server):
+    """A logged-in TestClient over the in-memory backend."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    with TestClient(server.app) as client:
+        token = client.post("/api/auth/login", json={"username": "365run", "password": "GANG365"}).json()["token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        yield client
+
+@pytest.fixture
+def event(client):
+    """Upload nine participants and generate three 2m1f teams."""
+    rows = ["name,gender"] + [f"Runner {i},{'MMF'[i % 3]}" for i in range(9)]
+    csv = "\n".join(rows)
+    assert _wait_for_job(client, client.post("/api/participants/upload", files={"file": ("p.csv", csv)}))["status"] == "succeeded"
+    assert _wait_for_job(client, client.post("/api/teams/generate", json={"mode": "2m1f"}))["status"] == "succeeded"
+    return client
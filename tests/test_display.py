@@ -0,0 +1,42 @@
+def top_rows(client):
+    r = client.get("/api/display?page=0")
+    assert r.status_code == 200, r.text
+    return [(row["team_id"], row["total_time_str"]) for row in r.json()["rows"]]
+
+def save(client, team_id, station, time_str):
+    r = client.post("/api/times/save", json={"team_id": team_id, "station": station, "time_str": time_str})
+    assert r.status_code == 200, r.text
+
+def test_own_write_shows_up_immediately(event):
+    assert top_rows(event) == []
+    save(event, 2, "Row 750m", "03:00")
+    assert top_rows(event) == [(2, "03:00")]
+
+def test_write_through_another_worker_shows_up_after_poll(server, event):
+    assert top_rows(event) == []
+
+    async def other_worker_saves():
+        await server.db.teams.update_one({"team_id": 3}, {"$set": {
+            "station_times.Row 750m": {"time_str": "02:00", "total_seconds": 120}
+        }})
+        # What that worker's public_data_changed does to the shared version
+        await server.next_sequence("data:public")
+
+    event.portal.call(other_worker_saves)
+    event.portal.call(server.poll_data_versions)
+    assert top_rows(event) == [(3, "02:00")]
+
+def test_pages_are_read_from_primary(server, event, monkeypatch):
+    import mongomock_motor
+
+    # A secondary that hasn't replicated anything yet
+    monkeypatch.setattr(server, "public_db", mongomock_motor.AsyncMongoMockClient()["lagging"])
+    save(event, 1, "Row 750m", "01:30")
+    assert top_rows(event) == [(1, "01:30")]
+
+def test_unchanged_page_is_not_modified(event):
+    save(event, 1, "Row 750m", "01:30")
+    etag = event.get("/api/display?page=0").headers["ETag"]
+    assert event.get("/api/display?page=0", headers={"If-None-Match": etag}).status_code == 304
+    save(event, 2, "Row 750m", "01:00")
+    assert event.get("/api/display?page=0", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+def _ago(seconds):
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+def test_mutating_jobs_are_exclusive_across_workers(server, client):
+    other = server.JobRunner(1)  # a second worker's runner
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow(progress):
+            await release.wait()
+            return {"message": "done"}
+
+        first = await server.job_runner.submit("upload_participants", slow)
+        with pytest.raises(server.HTTPException) as exc:
+            await other.submit("reset", slow)
+        assert exc.value.status_code == 409
+        assert first["job_id"] in exc.value.detail
+
+        release.set()
+        while (await server.db.jobs.find_one({"job_id": first["job_id"]}))["status"] != "succeeded":
+            await asyncio.sleep(0.01)
+        second = await other.submit("reset", slow)
+        return second["job_id"]
+
+    assert client.portal.call(scenario)
+    # The API path refuses too while another worker holds the lock
+    client.portal.call(server.db.locks.delete_many, {})
+    client.portal.call(server.db.locks.insert_one, {
+        "_id": server.ADMIN_LOCK_ID, "owner": "elsewhere", "kind": "generate_teams", "heartbeat": server._now_iso()
+    })
+    r = client.post("/api/reset")
+    assert r.status_code == 409 and "elsewhere" in r.json()["detail"]
+
+def test_stale_lock_is_taken_over(server, client, wait_for_job):
+    client.portal.call(server.db.locks.insert_one, {
+        "_id": server.ADMIN_LOCK_ID, "owner": "dead-worker", "kind": "reset", "heartbeat": _ago(300)
+    })
+    job = wait_for_job(client, client.post("/api/reset"))
+    assert job["status"] == "succeeded"
+    assert client.portal.call(server.db.locks.find_one, {"_id": server.ADMIN_LOCK_ID}) is None
+
+def test_only_jobs_with_stale_heartbeats_are_failed(server, client):
+    jobs = [
+        {"job_id": "live", "status": "running", "heartbeat": server._now_iso()},
+        {"job_id": "dead", "status": "running", "heartbeat": _ago(300)},
+        {"job_id": "legacy", "status": "queued"},
+        {"job_id": "done", "status": "succeeded", "heartbeat": _ago(300)},
+    ]
+    client.portal.call(server.db.jobs.insert_many, jobs)
+    client.portal.call(server.fail_stale_jobs)
+    status = {j["job_id"]: j["status"] for j in client.get("/api/jobs").json()["jobs"]}
+    assert status == {"live": "running", "dead": "failed", "legacy": "failed", "done": "succeeded"}
@@ -0,0 +1,114 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+FIRST_NAMES = ["Sam", "Samantha", "Samuel", "Sarah", "Sara", "Sophie", "Sean", "Simon", "Stella", "Steve"] + [
+    a + b for a in ["Al", "Be", "Ca", "Da", "El", "Fi", "Ga", "Ha", "Jo", "Ka", "Li", "Ma"] for b in ["na", "ra", "n", "o"]
+]
+SURNAME_HEADS = ["Al", "Bar", "Car", "Ed", "Fra", "Har", "John", "Kim", "Mac", "Par", "Rob", "Sa", "Sm", "St", "Wil"]
+SURNAME_TAILS = ["son", "man", "ley", "ton", "field", "smith", "berg", "wood", "ford", "ham", "ker", "ski"]
+
+def build_index(participants, team_size=3):
+    teams = [
+        {"team_id": i // team_size + 1, "members": participants[i:i + team_size]}
+        for i in range(0, len(participants) - len(participants) % team_size, team_size)
+    ]
+    index = server.MemberSearchIndex()
+    index.replace_participants(participants)
+    index.replace_teams(teams, [{"wave_id": 1, "team_ids": [t["team_id"] for t in teams]}])
+    return index
+
+def names(index, query, limit=20):
+    return [r["name"] for r in index.search(query, limit)]
+
+@pytest.fixture(scope="module")
+def large_index():
+    rng = random.Random(7)
+    surnames = [h + t + e for h in SURNAME_HEADS for t in SURNAME_TAILS for e in ("", "s", "e")]
+    participants = [
+        {"name": f"{rng.choice(FIRST_NAMES)} {rng.choice(surnames)}", "gender": rng.choice("MF")}
+        for _ in range(12000)
+    ]
+    return build_index(participants)
+
+def test_exact_token_first_then_longer_prefixes_then_typos():
+    index = build_index([{"name": n, "gender": "M"} for n in ["Samuel Ray", "Sam Zed", "Sam Abe", "Samantha Ng"]]
+                        + [{"name": "Samnatha Typo", "gender": "F"}])
+    assert names(index, "sam") == ["Sam Abe", "Sam Zed", "Samantha Ng", "Samnatha Typo", "Samuel Ray"]
+    results = index.search("samantha")
+    assert [(r["name"], r["match"]) for r in results] == [("Samantha Ng", "prefix"), ("Samnatha Typo", "fuzzy")]
+
+def test_team_members_are_listed_once_and_pages_are_full(large_index):
+    results = large_index.search("sam", 20)
+    assert len(results) == 20
+    assert all(r["team_id"] is not None for r in results)
+    assert len({(r["name"], r["team_id"]) for r in results}) == 20
+
+def test_multi_token_queries_match_every_token():
+    index = build_index([{"name": n, "gender": "F"} for n in ["Sam Smith", "Sam Jones", "Anna Smith", "Sammy Smyth"]])
+    assert names(index, "sam smith") == ["Sam Smith", "Sammy Smyth"]
+    assert names(index, "smith sa") == ["Sam Smith", "Sammy Smyth"]
+    assert names(index, "sam x") == []
+
+def test_index_follows_team_edits():
+    index = build_index([{"name": n, "gender": "M"} for n in ["Ann Lee", "Bob Lee", "Cy Lee"]])
+    index.set_team_members(1, [{"name": "Dee Lee", "gender": "F"}])
+    assert [(r["name"], r["team_id"]) for r in index.search("dee")] == [("Dee Lee", 1)]
+    # Ann is back to being only on the participant list
+    assert [(r["name"], r["team_id"]) for r in index.search("ann")] == [("Ann Lee", None)]
+
+@pytest.mark.parametrize("query", ["s", "sam", "samnatha", "sam smith", "johnsen"])
+def test_search_stays_fast_at_12k_participants(large_index, query):
+    large_index.search(query)  # warm the per-token ordering
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        large_index.search(query)
+        best = min(best, time.perf_counter() - start)
+    assert best < 0.001, f"{query!r} took {best * 1000:.2f} ms"
+
+def test_typo_candidates_are_capped_to_the_closest(monkeypatch):
+    # Every surname is within the bigram threshold of the query
+    index = build_index([{"name": f"Al Sur{n}name", "gender": "M"} for n in range(2000)])
+    checked = []
+    typo_distances = server._typo_distances
+
+    def recording(q, tokens, max_dist):
+        checked.append(len(tokens))
+        return typo_distances(q, tokens, max_dist)
+
+    monkeypatch.setattr(server, "_typo_distances", recording)
+    results = names(index, "surr12name")
+    assert checked == [server.FUZZY_CANDIDATE_LIMIT]
+    assert {"Al Sur12name", "Al Sur112name"} <= set(results)
+
+def test_write_through_another_worker_rebuilds_index(server, event):
+    [runner] = event.get("/api/search?q=runner 4").json()["results"]
+    team_id = runner["team_id"]
+
+    async def other_worker_edits():
+        await server.db.teams.update_one({"team_id": team_id}, {"$set": {"members": [{"name": "Late Swap", "gender": "F"}]}})
+        await server.next_sequence("data:members")
+
+    event.portal.call(other_worker_edits)
+    # What watch_data_versions does on its next tick
+    event.portal.call(server.poll_data_versions)
+    assert server.member_index.version != server.data_versions["members"]
+    event.portal.call(server.rebuild_member_index)
+
+    assert [r["team_id"] for r in event.get("/api/search?q=late").json()["results"]] == [team_id]
+    assert [r["team_id"] for r in event.get("/api/search?q=runner 4").json()["results"]] == [None]
+
+def test_own_writes_keep_index_current(server, event):
+    r = event.put("/api/teams/1", json={"members": [{"name": "New Person", "gender": "M"}]})
+    assert r.status_code == 200, r.text
+    assert server.member_index.version == server.data_versions["members"]
+    assert [r["team_id"] for r in event.get("/api/search?q=new person").json()["results"]] == [1]
@@ -0,0 +1,78 @@
+import pytest
+
+def team(team_id, *times):
+    return {"team_id": team_id, "members": [], "times": list(times) + [None] * (6 - len(times))}
+
+FINISHED = [team(i, *[100] * 6) for i in (1, 2, 3)]
+
+def test_projection_scales_remaining_medians_by_pace(server):
+    # Half the median pace over three stations: 150 done + 0.5 * 300 to go
+    teams = FINISHED + [team(4, 50, 50, 50)]
+    p = server.projection_cache.projections(teams)[4]
+    assert p["projected_seconds"] == 300
+    assert p["projected_time_str"] == "05:00"
+    assert p["projected_low_seconds"] == p["projected_high_seconds"] == 300
+    assert p["projected_rank"] == 1
+
+def test_interval_widens_with_spread_of_reference_times(server):
+    teams = [team(1, *[90] * 6), team(2, *[110] * 6), team(3, *[100] * 6), team(4, 100)]
+    p = server.projection_cache.projections(teams)[4]
+    assert p["projected_low_seconds"] < p["projected_seconds"] < p["projected_high_seconds"]
+    assert p["projected_high_seconds"] - p["projected_seconds"] == p["projected_seconds"] - p["projected_low_seconds"]
+
+def test_pace_is_clipped(server):
+    teams = FINISHED + [team(4, 1, 1, 1)]
+    # 3s so far, then at most twice as fast as the median for the rest
+    assert server.projection_cache.projections(teams)[4]["projected_seconds"] == 3 + 150
+
+def test_no_projection_before_start_or_for_unrun_stations(server):
+    teams = [team(1, 100, 100), team(2, 120), team(3)]
+    p = server.projection_cache.projections(teams)
+    # Station 3 has no times from anyone yet, and team 3 hasn't started
+    assert p[1] is server.NO_PROJECTION
+    assert p[3] is server.NO_PROJECTION
+
+def test_uses_all_recorded_times_until_enough_teams_finish(server):
+    teams = [team(1, *[100] * 6), team(2, 200, 200, 200, 200, 200), team(3, 200)]
+    # Medians over every recorded time: 200 for station 1, 150 for stations
+    # 2-5 and 100 for station 6
+    pace = (200 / 200 + 4 * 200 / 150) / 5
+    p = server.projection_cache.projections(teams)
+    assert p[2]["projected_seconds"] == round(1000 + pace * 100)
+
+def test_non_time_stations_do_not_count(server, monkeypatch):
+    stations = server.DEFAULT_STATIONS[:2] + [{"name": "Wall balls", "unit": "reps"}]
+    monkeypatch.setattr(server, "station_config", server.StationConfig(stations))
+    teams = [{"team_id": i, "members": [], "times": [100, 100, 30]} for i in (1, 2, 3)]
+    teams.append({"team_id": 4, "members": [], "times": [100, None, 99]})
+    assert server.projection_cache.projections(teams)[4]["projected_seconds"] == 200
+
+@pytest.mark.parametrize("first_ids, second_ids", [((1, 2, 3), (1, 2, 4)), ((1, 2, 3), (3, 2, 1))])
+def test_cache_follows_the_teams_it_is_given(server, first_ids, second_ids):
+    server.projection_cache.projections([team(i, 100) for i in first_ids])
+    result = server.projection_cache.projections([team(i, 100) for i in second_ids])
+    assert set(result) == set(second_ids)
+
+def test_cache_picks_up_times_written_elsewhere(server):
+    teams = FINISHED + [team(4, 50, 50, 50)]
+    assert server.projection_cache.projections(teams)[4]["projected_seconds"] == 300
+    # e.g. saved through another worker: only the documents change
+    teams[3]["times"][3] = 100
+    # Pace 0.625 now: 250 done + 0.625 * 200 to go
+    assert server.projection_cache.projections(teams)[4]["projected_seconds"] == 375
+
+def test_cache_is_reused_for_the_same_data_version(server):
+    teams = FINISHED + [team(4, 50, 50, 50)]
+    first = server.projection_cache.projections(teams, data_version=7)
+    # Documents read at the same version are the same documents, so the
+    # times are not even looked at
+    teams[3]["times"][3] = 100
+    assert server.projection_cache.projections(teams, data_version=7) is first
+    assert server.projection_cache.projections(teams, data_version=8)[4]["projected_seconds"] == 375
+
+def test_unversioned_read_in_between_is_not_pinned_to_the_version(server):
+    current = FINISHED + [team(4, 50, 50, 50, 100)]
+    server.projection_cache.projections(current, data_version=7)
+    lagging = FINISHED + [team(4, 50, 50, 50)]
+    assert server.projection_cache.projections(lagging)[4]["projected_seconds"] == 300
+    assert server.projection_cache.projections(current, data_version=7)[4]["projected_seconds"] == 375
@@ -0,0 +1,66 @@
+import pytest
+
+COLLECTIONS = ("participants", "teams", "waves", "settings")
+SPECTATOR = {"Authorization": ""}
+
+@pytest.fixture
+def secondary(server, monkeypatch):
+    """A public_db that only sees the primary's data when replicate() is called."""
+    import mongomock_motor
+
+    secondary = mongomock_motor.AsyncMongoMockClient()["triotag_secondary"]
+    monkeypatch.setattr(server, "public_db", secondary)
+    return secondary
+
+def replicate(client, server, secondary):
+    async def copy():
+        for name in COLLECTIONS:
+            await getattr(secondary, name).delete_many({})
+            docs = await getattr(server.db, name).find({}).to_list(10000)
+            if docs:
+                await getattr(secondary, name).insert_many(docs)
+
+    client.portal.call(copy)
+
+def projected(board):
+    return {e["team_id"]: (e["total_seconds"], e["projected_seconds"]) for e in board["leaderboard"]}
+
+def save(client, team_id, station, time_str):
+    r = client.post("/api/times/save", json={"team_id": team_id, "station": station, "time_str": time_str})
+    assert r.status_code == 200, r.text
+
+def test_lagging_reads_never_pin_stale_projections_or_pages(server, event, secondary, monkeypatch):
+    replicate(event, server, secondary)
+    for team_id, time_str in ((1, "03:00"), (2, "04:00"), (3, "05:00")):
+        save(event, team_id, "Row 750m", time_str)
+    save(event, 1, "Ski 750m", "02:00")
+
+    # The secondary hasn't caught up: spectators see the old board...
+    assert all(total == 0 for total, _ in projected(event.get("/api/leaderboard", headers=SPECTATOR).json()).values())
+    # ...while the big screen, built from the primary, is current
+    assert [row["team_id"] for row in event.get("/api/display?page=0").json()["rows"]] == [2, 1, 3]
+
+    replicate(event, server, secondary)
+    lagged_then_caught_up = projected(event.get("/api/leaderboard", headers=SPECTATOR).json())
+    monkeypatch.setattr(server, "public_db", server.db)
+    assert lagged_then_caught_up == projected(event.get("/api/leaderboard", headers=SPECTATOR).json())
+    assert lagged_then_caught_up[1][0] == 300
+
+def test_admin_reads_see_their_own_writes(server, event, secondary):
+    replicate(event, server, secondary)
+    save(event, 2, "Row 750m", "03:00")
+    r = event.put("/api/teams/1", json={"members": [{"name": "Edited Name", "gender": "F"}]})
+    assert r.status_code == 200, r.text
+
+    def team(waves, team_id):
+        return next(t for w in waves["waves"] for t in w["teams"] if t["team_id"] == team_id)
+
+    # The logged-in client reads the primary...
+    waves = event.get("/api/waves").json()
+    assert team(waves, 2)["station_times"]["Row 750m"]["time_str"] == "03:00"
+    assert [m["name"] for m in team(waves, 1)["members"]] == ["Edited Name"]
+    assert event.get("/api/participants/summary").json()["total"] == 9
+    # ...while spectators (no token, or a bad one) get the lagging copy
+    for headers in (SPECTATOR, {"Authorization": "Bearer not-a-token"}):
+        stale = event.get("/api/waves", headers=headers).json()
+        assert "Row 750m" not in team(stale, 2)["station_times"]
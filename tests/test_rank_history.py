@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+def save(client, team_id, station, time_str):
+    r = client.post("/api/times/save", json={"team_id": team_id, "station": station, "time_str": time_str})
+    assert r.status_code == 200, r.text
+
+def moves(client):
+    return [(e["team_id"], e["from_rank"], e["to_rank"]) for e in client.get("/api/leaderboard/history").json()["events"]]
+
+def live_order(client):
+    return [e["team_id"] for e in client.get("/api/leaderboard").json()["leaderboard"]]
+
+def test_first_move_after_startup_is_recorded(server, event):
+    # The history state is loaded lazily; it must not already include this write
+    server.rank_history.reset()
+    save(event, 3, "Row 750m", "03:00")
+    assert moves(event) == [(3, 3, 1)]
+
+def test_replay_matches_live_leaderboard_at_each_point(event):
+    save(event, 2, "Row 750m", "03:00")
+    save(event, 3, "Row 750m", "02:00")
+    mid = event.get("/api/leaderboard/replay").json()
+    save(event, 1, "Row 750m", "01:00")
+    save(event, 3, "Ski 750m", "05:00")
+
+    assert [e["team_id"] for e in event.get("/api/leaderboard/replay").json()["leaderboard"]] == live_order(event)
+    past = event.get(f"/api/leaderboard/replay?seq={mid['seq']}").json()
+    assert [e["team_id"] for e in past["leaderboard"]] == [3, 2, 1]
+    assert [e["total_seconds"] for e in past["leaderboard"]] == [120, 180, 0]
+
+def test_movers_between_two_points(event):
+    save(event, 1, "Row 750m", "02:00")
+    start = event.get("/api/leaderboard/replay").json()["seq"]
+    save(event, 3, "Row 750m", "01:00")
+
+    movers = event.get(f"/api/leaderboard/movers?since_seq={start}").json()["movers"]
+    assert {(m["team_id"], m["from_rank"], m["to_rank"]) for m in movers} == {(3, 3, 1), (1, 1, 2), (2, 2, 3)}
+    assert movers[0]["team_id"] == 3 and movers[0]["gained"] == 2
+
+def test_workers_share_seq_and_follow_each_others_moves(server, event):
+    other = server.RankHistory()  # a second worker's view
+
+    save(event, 2, "Row 750m", "03:00")
+
+    async def other_worker_saves(team_id, seconds):
+        # Same sequence as save_time: prepare, write, record
+        await other.prepare()
+        await server.db.teams.update_one({"team_id": team_id}, {"$set": {
+            "station_times.Row 750m": {"time_str": "", "total_seconds": seconds}
+        }})
+        await other.record(team_id, 0)
+
+    event.portal.call(other_worker_saves, 3, 100)
+    save(event, 1, "Row 750m", "01:00")
+    event.portal.call(other_worker_saves, 2, 50)
+
+    seqs = [e["seq"] for e in event.get("/api/leaderboard/history").json()["events"]]
+    assert len(seqs) == len(set(seqs)) == 4
+    assert moves(event) == [(2, 2, 1), (3, 3, 1), (1, 3, 1), (2, 3, 1)]
+    assert [e["team_id"] for e in event.get("/api/leaderboard/replay").json()["leaderboard"]] == live_order(event) == [2, 1, 3]
+
+def test_history_failure_does_not_fail_save(server, event, monkeypatch):
+    async def broken(*args):
+        raise RuntimeError("history store down")
+
+    monkeypatch.setattr(server.rank_history, "record", broken)
+    save(event, 1, "Row 750m", "02:00")
+    board = event.get("/api/leaderboard").json()["leaderboard"]
+    assert board[0]["team_id"] == 1 and board[0]["total_seconds"] == 120
+
+def test_replay_at_accepts_any_utc_offset(event):
+    save(event, 2, "Row 750m", "03:00")
+    [entry] = event.get("/api/leaderboard/history").json()["events"]
+    recorded = datetime.fromisoformat(entry["at"])
+    save(event, 3, "Row 750m", "02:00")
+
+    # The same instant as the first move, written three ways
+    for at in (
+        recorded.astimezone(timezone(timedelta(hours=-5))).isoformat(),
+        recorded.replace(tzinfo=None).isoformat(),
+        recorded.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+    ):
+        r = event.get("/api/leaderboard/replay", params={"at": at})
+        assert r.status_code == 200, r.text
+        assert r.json()["seq"] == entry["seq"]
+
+def test_invalid_timestamps_are_rejected(event):
+    save(event, 2, "Row 750m", "03:00")
+    assert event.get("/api/leaderboard/replay", params={"at": "yesterday"}).status_code == 400
+    r = event.get("/api/leaderboard/movers", params={"since": "2024-13-01T00:00:00"})
+    assert r.status_code == 400 and r.json()["detail"].startswith("Invalid timestamp")
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+def read(directory, name):
+    return json.loads((directory / name).read_text())
+
+@pytest.fixture
+def publisher(server, tmp_path, monkeypatch):
+    publisher = server.SnapshotPublisher(str(tmp_path))
+    monkeypatch.setattr(server, "snapshot_publisher", publisher)
+    monkeypatch.setattr(server, "SNAPSHOT_DEBOUNCE_SECONDS", 0.05)
+    return publisher
+
+def test_publish_writes_versioned_files_alias_and_manifest(publisher, event, tmp_path):
+    r = event.post("/api/snapshots/publish")
+    assert r.status_code == 200, r.text
+    version = r.json()["version"]
+
+    manifest = read(tmp_path, "manifest.json")
+    assert manifest["version"] == version
+    assert set(manifest["files"]) >= {"leaderboard", "waves", "stations", "station-1"}
+    for name, filename in manifest["files"].items():
+        assert read(tmp_path, filename) == read(tmp_path, f"{name}.json")
+    assert len(read(tmp_path, "leaderboard.json")["leaderboard"]) == 3
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_writes_within_the_debounce_window_share_one_publish(server, publisher, event, tmp_path, monkeypatch):
+    event.portal.call(asyncio.sleep, 0.3)  # let the upload/generate publish settle
+    # Wide enough that three requests always land inside one window
+    monkeypatch.setattr(server, "SNAPSHOT_DEBOUNCE_SECONDS", 0.5)
+    before = read(tmp_path, "manifest.json")["version"]
+    for team_id in (1, 2, 3):
+        r = event.post("/api/times/save", json={"team_id": team_id, "station": "Row 750m", "time_str": "03:00"})
+        assert r.status_code == 200, r.text
+    event.portal.call(asyncio.sleep, 1)
+
+    manifest = read(tmp_path, "manifest.json")
+    assert manifest["version"] == before + 1
+    board = read(tmp_path, manifest["files"]["leaderboard"])["leaderboard"]
+    assert all(e["total_seconds"] == 180 for e in board)
+
+def test_workers_never_move_the_manifest_backwards(server, tmp_path):
+    first, second = server.SnapshotPublisher(str(tmp_path)), server.SnapshotPublisher(str(tmp_path))
+    files = {"leaderboard": {"leaderboard": []}}
+    assert first._write(files, data_version=1) == 1
+    assert second._write(files, data_version=3) == 2
+    # A publish that read older data than what is already out is dropped
+    assert first._write(files, data_version=2) == 2
+    assert read(tmp_path, "manifest.json")["data_version"] == 3
+    assert first._write(files, data_version=3) == 3
+
+def test_concurrent_publishes_get_distinct_versions_and_keep_current_files(server, tmp_path):
+    publishers = [server.SnapshotPublisher(str(tmp_path)) for _ in range(4)]
+    versions = []
+
+    def publish_many(publisher):
+        for _ in range(10):
+            versions.append(publisher._write({"leaderboard": {"leaderboard": []}}, data_version=0))
+
+    threads = [threading.Thread(target=publish_many, args=(p,)) for p in publishers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(versions) == list(range(1, 41))
+    manifest = read(tmp_path, "manifest.json")
+    assert manifest["version"] == 40
+    assert read(tmp_path, manifest["files"]["leaderboard"])["version"] == 40
+    kept = sorted(int(p.name.split(".")[1]) for p in tmp_path.glob("leaderboard.*.json"))
+    assert kept == list(range(40 - server.SNAPSHOT_KEEP_VERSIONS + 1, 41))
+
+def test_failed_write_leaves_previous_file_intact(server, tmp_path):
+    path = tmp_path / "leaderboard.json"
+    server._write_json_atomic(path, {"version": 1})
+    with pytest.raises(TypeError):
+        server._write_json_atomic(path, {"version": 2, "bad": object()})
+    assert read(tmp_path, "leaderboard.json") == {"version": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["leaderboard.json"]
@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import time
+import socket
+import subprocess
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("uvicorn")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Workers are restarted and scaled mid-event, so importing the app and
+# answering the first request must stay well inside a second. Mongo is pointed
+# at a closed port: neither budget may depend on the database being reachable.
+IMPORT_BUDGET_SECONDS = 0.8
+FIRST_REQUEST_BUDGET_SECONDS = 1.0
+
+ENV = {
+    **os.environ,
+    "MONGO_URL": "mongodb://127.0.0.1:9/?serverSelectionTimeoutMS=500",
+    "DB_NAME": "triotag_startup_test",
+}
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_import_time_budget():
+    script = "import time; t = time.perf_counter(); import server; print(time.perf_counter() - t)"
+    # Best of a few runs so a cold disk cache doesn't fail the build
+    best = min(
+        float(subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, env=ENV,
+                             capture_output=True, text=True, check=True).stdout)
+        for _ in range(3)
+    )
+    assert best < IMPORT_BUDGET_SECONDS, f"import server took {best:.3f}s"
+
+    # The driver and numpy are loaded on first use, not at import
+    script = "import sys, server; print(','.join(m for m in ('motor', 'pymongo', 'numpy') if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, env=ENV,
+                            capture_output=True, text=True, check=True).stdout.strip()
+    assert loaded == ""
+
+def test_time_to_first_request_budget():
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        elapsed = None
+        while time.perf_counter() - start < 10:
+            try:
+                status, body = _get(f"http://127.0.0.1:{port}/api/health")
+            except OSError:
+                time.sleep(0.01)
+                continue
+            elapsed = time.perf_counter() - start
+            assert status == 200 and body == {"status": "ok"}
+            break
+        assert elapsed is not None, "server never answered /api/health"
+        assert elapsed < FIRST_REQUEST_BUDGET_SECONDS, f"first request answered after {elapsed:.3f}s"
+
+        # Serving, but not ready: there is no Mongo to warm up against
+        status, body = _get(f"http://127.0.0.1:{port}/api/ready")
+        assert status == 503
+        assert body["ready"] is False
+        assert body["checks"]["mongo"] is False
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
@@ -0,0 +1,42 @@
+def team_total(client, team_id):
+    board = client.get("/api/leaderboard").json()["leaderboard"]
+    return next(e["total_seconds"] for e in board if e["team_id"] == team_id)
+
+def save(client, team_id, station, time_str):
+    r = client.post("/api/times/save", json={"team_id": team_id, "station": station, "time_str": time_str})
+    assert r.status_code == 200, r.text
+
+def test_save_after_migration_with_map_schema_still_counts(server, event, wait_for_job, monkeypatch):
+    monkeypatch.setattr(server, "COMPACT_STATION_TIMES", False)
+    save(event, 1, "Row 750m", "03:00")
+
+    job = wait_for_job(event, event.post("/api/admin/migrate-station-times"))
+    assert job["status"] == "succeeded"
+    assert job["result"]["remaining"] == 0
+
+    # STATION_TIMES_SCHEMA is still map, but the document now has `times`
+    save(event, 1, "Ski 750m", "04:00")
+    assert team_total(event, 1) == 420
+
+    teams = {t["team_id"]: t for t in event.get("/api/teams").json()["teams"]}
+    assert set(teams[1]["station_times"]) == {"Row 750m", "Ski 750m"}
+
+def test_migration_preserves_times(server, event, wait_for_job, monkeypatch):
+    monkeypatch.setattr(server, "COMPACT_STATION_TIMES", False)
+    save(event, 2, "Row 750m", "02:30")
+    save(event, 2, "Ski 750m", "03:15")
+    before = event.get("/api/leaderboard").json()["leaderboard"]
+
+    wait_for_job(event, event.post("/api/admin/migrate-station-times"))
+
+    after = event.get("/api/leaderboard").json()["leaderboard"]
+    assert [(e["team_id"], e["total_seconds"]) for e in after] == [(e["team_id"], e["total_seconds"]) for e in before]
+    assert team_total(event, 2) == 345
+
+def test_compact_schema_migrates_map_document_on_write(server, event, monkeypatch):
+    # Teams generated under the map schema, then the env flips to array
+    monkeypatch.setattr(server, "COMPACT_STATION_TIMES", False)
+    save(event, 3, "Row 750m", "03:00")
+    monkeypatch.setattr(server, "COMPACT_STATION_TIMES", True)
+    save(event, 3, "Ski 750m", "01:00")
+    assert team_total(event, 3) == 240
@@ -0,0 +1,107 @@
+import pytest
+
+def definitions(server, *pairs):
+    return [server.StationDefinition(name=name, unit=unit) for name, unit in pairs]
+
+@pytest.mark.parametrize("pairs, detail", [
+    ([("Row", "time"), ("Row", "reps")], "Duplicate station: Row"),
+    ([("Row 0.5km", "time")], "cannot contain '.'"),
+    ([("$Row", "time")], "cannot contain '.'"),
+    ([("Row", "calories")], "Invalid unit for Row"),
+    ([("  ", "time")], "cannot be empty"),
+    ([], "between 1 and 12"),
+    ([(f"Station {i}", "time") for i in range(13)], "between 1 and 12"),
+])
+def test_invalid_definitions_are_rejected(server, pairs, detail):
+    with pytest.raises(server.HTTPException) as exc:
+        server.validate_station_definitions(definitions(server, *pairs))
+    assert exc.value.status_code == 400
+    assert detail in exc.value.detail
+
+def test_definitions_are_normalised(server):
+    result = server.validate_station_definitions(definitions(server, (" Row ", "TIME"), ("Wall balls", " reps")))
+    assert result == [{"name": "Row", "unit": "time"}, {"name": "Wall balls", "unit": "reps"}]
+    assert len(server.validate_station_definitions(definitions(server, *[(f"S{i}", "time") for i in range(12)]))) == 12
+
+@pytest.mark.parametrize("raw, expected", [("5:00", 300), ("12:05", 725), ("0:59", 59), ("75:00", 4500)])
+def test_parse_time(server, raw, expected):
+    assert server._parse_time(raw) == expected
+
+@pytest.mark.parametrize("raw", ["5:60", "5", "1:2:3", "a:10", "-1:10", ""])
+def test_parse_time_rejects(server, raw):
+    with pytest.raises(ValueError):
+        server._parse_time(raw)
+
+@pytest.mark.parametrize("raw, expected", [("12", 12), ("12 reps", 12), ("40REPS", 40), (" 0 ", 0)])
+def test_parse_reps(server, raw, expected):
+    assert server._parse_reps(raw) == expected
+
+@pytest.mark.parametrize("raw", ["12.5", "-3", "twelve", "reps"])
+def test_parse_reps_rejects(server, raw):
+    with pytest.raises(ValueError):
+        server._parse_reps(raw)
+
+@pytest.mark.parametrize("raw, expected", [("1.2km", 1200), ("120", 120), ("120m", 120), ("0.75 km", 750), ("99.6m", 100)])
+def test_parse_distance(server, raw, expected):
+    assert server._parse_distance(raw) == expected
+
+@pytest.mark.parametrize("raw", ["-5m", "far", "1.2mi", "", "inf", "infkm", "-inf", "1e400m", "nan", "NaNkm"])
+def test_parse_distance_rejects(server, raw):
+    with pytest.raises(ValueError):
+        server._parse_distance(raw)
+
+def test_parse_errors_become_400s(server):
+    config = server.StationConfig([{"name": "Row", "unit": "time"}, {"name": "Wall balls", "unit": "reps"}])
+    assert config.parse("Wall balls", "30 reps") == (1, 30)
+    with pytest.raises(server.HTTPException) as exc:
+        config.parse("Row", "5:60")
+    assert exc.value.status_code == 400
+    with pytest.raises(server.HTTPException) as exc:
+        config.parse("Ski", "5:00")
+    assert exc.value.detail == "Invalid station: Ski"
+
+def test_stations_can_change_until_times_exist(server, event):
+    stations = [{"name": "Row", "unit": "time"}, {"name": "Wall balls", "unit": "reps"}, {"name": "Sled", "unit": "distance"}]
+    r = event.put("/api/stations", json={"stations": stations})
+    assert r.status_code == 200, r.text
+    assert event.get("/api/stations").json()["stations"] == ["Row", "Wall balls", "Sled"]
+
+    r = event.post("/api/times/save", json={"team_id": 1, "station": "Wall balls", "time_str": "30 reps"})
+    assert r.status_code == 200, r.text
+
+    r = event.put("/api/stations", json={"stations": stations[:2]})
+    assert r.status_code == 409
+    assert "once times are recorded" in r.json()["detail"]
+    assert event.get("/api/stations").json()["stations"] == ["Row", "Wall balls", "Sled"]
+
+def test_non_finite_distance_is_a_400(server, event):
+    stations = [{"name": "Row", "unit": "time"}, {"name": "Sled", "unit": "distance"}]
+    assert event.put("/api/stations", json={"stations": stations}).status_code == 200
+    for raw in ("inf", "1e400m", "nan"):
+        r = event.post("/api/times/save", json={"team_id": 1, "station": "Sled", "time_str": raw})
+        assert r.status_code == 400
+        assert r.json()["detail"].startswith("Distance must be in metres")
+
+def test_station_change_keeps_a_compact_time_saved_after_the_check(server, event, monkeypatch):
+    monkeypatch.setattr(server, "COMPACT_STATION_TIMES", True)
+    event.portal.call(server.db.teams.update_many, {}, {"$set": {"times": [None] * 6}, "$unset": {"station_times": ""}})
+    event.portal.call(server.db.teams.update_one, {"team_id": 2}, {"$set": {"times.0": 180}})
+
+    # As if the save landed between the has-times check and the reset
+    async def no_times(*args, **kwargs):
+        return 0
+    monkeypatch.setattr(type(server.db.teams), "count_documents", no_times)
+
+    stations = [{"name": "Row", "unit": "time"}, {"name": "Ski", "unit": "time"}]
+    assert event.put("/api/stations", json={"stations": stations}).status_code == 200
+    teams = {t["team_id"]: t["times"] for t in event.portal.call(server.db.teams.find({}, {"_id": 0}).to_list, 100)}
+    assert teams[1] == [None, None]
+    assert teams[2][0] == 180
+
+def test_station_change_waits_for_admin_jobs(server, event):
+    event.portal.call(server.db.locks.insert_one, {
+        "_id": server.ADMIN_LOCK_ID, "owner": "elsewhere", "kind": "generate_teams", "heartbeat": server._now_iso()
+    })
+    r = event.put("/api/stations", json={"stations": [{"name": "Row", "unit": "time"}]})
+    assert r.status_code == 409 and "elsewhere" in r.json()["detail"]
+    assert event.get("/api/stations").json()["stations"] == [s["name"] for s in server.DEFAULT_STATIONS]
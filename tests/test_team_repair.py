@@ -0,0 +1,120 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+def make_event(genders):
+    """One participant per gender letter, grouped into teams and waves of three in order."""
+    participants = [{"name": f"P{i}", "gender": g} for i, g in enumerate(genders)]
+    teams = [
+        server.new_team_doc(i // 3 + 1, [dict(p) for p in participants[i:i + 3]])
+        for i in range(0, len(participants), 3)
+    ]
+    waves = [
+        {"wave_id": i // 3 + 1, "team_ids": [t["team_id"] for t in teams[i:i + 3]]}
+        for i in range(0, len(teams), 3)
+    ]
+    return participants, teams, waves
+
+def mark(participants, checked_in, *names):
+    for p in participants:
+        if p["name"] in names:
+            p["checked_in"] = checked_in
+
+def test_gaps_are_closed_by_dissolving_the_smallest_teams():
+    participants, teams, waves = make_event("MMF" * 4)
+    mark(participants, False, "P0", "P3", "P6", "P9")
+
+    plan = server.repair_teams(teams, waves, participants)
+
+    # Four teams of two: two are filled from the fourth and the third stays short
+    assert plan["dissolved"] == [4]
+    assert plan["moved"] == 2
+    assert sorted(plan["updated"]) == [1, 2, 3]
+    assert [len(plan["updated"][tid]) for tid in (1, 2, 3)] == [3, 3, 2]
+    # Team 4 was alone in wave 2
+    assert plan["wave_deletes"] == [2] and plan["wave_updates"] == {}
+
+def test_equally_short_teams_dissolve_so_the_rest_become_2m1f():
+    participants, teams, waves = make_event("FFM" + "MMF" * 2)
+    # Leaves [F, F], [M, M], [M, M]: the lowest id [F, F] is the one to dissolve
+    mark(participants, False, "P2", "P5", "P8")
+
+    plan = server.repair_teams(teams, waves, participants)
+
+    assert plan["dissolved"] == [1]
+    assert plan["moved"] == 2
+    assert sorted(plan["updated"]) == [2, 3]
+    for members in plan["updated"].values():
+        assert sorted(m["gender"] for m in members) == ["F", "M", "M"]
+
+def test_refill_restores_2m1f_from_checked_in_participants():
+    participants, teams, waves = make_event("MMF" * 2 + "F")
+    # P6 is checked in but not on a team; P2 is a no-show
+    teams = teams[:2]
+    waves = [{"wave_id": 1, "team_ids": [1, 2]}]
+    mark(participants, False, "P2")
+    mark(participants, True, "P6")
+
+    plan = server.repair_teams(teams, waves, participants)
+
+    assert plan["moved"] == 0
+    assert plan["placed"] == 1
+    assert list(plan["updated"]) == [1]
+    assert sorted(m["gender"] for m in plan["updated"][1]) == ["F", "M", "M"]
+
+def test_started_teams_are_left_alone():
+    participants, teams, waves = make_event("MMF" * 2)
+    teams[0]["station_times"] = server.station_times_map([120] + [None] * (len(server.station_config.names) - 1))
+    mark(participants, False, "P0")
+
+    plan = server.repair_teams(teams, waves, participants)
+
+    assert plan["skipped_started_teams"] == [1]
+    assert plan["updated"] == {} and plan["dissolved"] == [] and plan["removed_members"] == []
+
+def test_late_arrivals_form_new_teams_in_the_last_wave():
+    participants, teams, waves = make_event("MMF" * 4)
+    teams, waves = teams[:3], [{"wave_id": 1, "team_ids": [1, 2, 3]}]
+    mark(participants, True, "P9", "P10", "P11")
+
+    plan = server.repair_teams(teams, waves, participants)
+
+    assert [t["team_id"] for t in plan["created"]] == [4]
+    assert plan["wave_creates"] == [{"wave_id": 2, "team_ids": [4]}]
+    assert plan["updated"] == {} and plan["moved"] == 0
+
+def test_nothing_to_repair_before_teams_are_generated():
+    participants, _, _ = make_event("MMF" * 2)
+    mark(participants, True, *[p["name"] for p in participants])
+
+    plan = server.repair_teams([], [], participants)
+
+    assert plan["created"] == [] and plan["wave_creates"] == [] and plan["placed"] == 0
+
+def test_check_in_and_admin_jobs_exclude_each_other(server, event):
+    event.portal.call(server.db.locks.insert_one, {
+        "_id": server.ADMIN_LOCK_ID, "owner": "elsewhere", "kind": "generate_teams", "heartbeat": server._now_iso()
+    })
+    r = event.post("/api/participants/checkin", json={"absent": ["Runner 0"]})
+    assert r.status_code == 409 and "elsewhere" in r.json()["detail"]
+    assert event.post("/api/teams/repair").status_code == 409
+    event.portal.call(server.db.locks.delete_many, {})
+
+    async def job_during_repair():
+        async def work(progress):
+            return {}
+
+        async with server.job_runner.exclusive("team_repair"):
+            with pytest.raises(server.HTTPException) as exc:
+                await server.job_runner.submit("upload_participants", work)
+        return exc.value.status_code
+
+    assert event.portal.call(job_during_repair) == 409
+    assert event.portal.call(server.db.locks.find_one, {"_id": server.ADMIN_LOCK_ID}) is None
+    assert event.post("/api/participants/checkin", json={"absent": ["Runner 0"]}).status_code == 200